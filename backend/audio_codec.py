@@ -0,0 +1,70 @@
+"""
+In-memory encoding of captured utterances for upload to speech-to-text.
+
+Utterances travel as raw 16-bit mono PCM from capture to this module and are
+only wrapped in a container here, straight into a BytesIO, so no spoken
+answer ever touches the filesystem. STT_UPLOAD_FORMAT picks the container:
+"flac" (lossless, about half the size of WAV), "opus" (Ogg/Opus through
+ffmpeg, roughly 20x smaller than WAV) or "wav". If an encoder is unavailable
+the utterance is sent as WAV.
+"""
+import io
+import os
+import wave
+import subprocess
+from typing import Tuple
+
+import numpy as np
+import soundfile as sf
+
+SAMPLE_WIDTH = 2
+
+STT_UPLOAD_FORMAT = os.getenv("STT_UPLOAD_FORMAT", "flac").lower()
+STT_OPUS_BITRATE = os.getenv("STT_OPUS_BITRATE", "24k")
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+
+
+def encode_wav(pcm: bytes, sample_rate: int = 16000) -> bytes:
+    """Wrap 16-bit mono PCM in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def encode_flac(pcm: bytes, sample_rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, np.frombuffer(pcm, dtype=np.int16), sample_rate, format="FLAC", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def encode_opus(pcm: bytes, sample_rate: int = 16000) -> bytes:
+    """Ogg/Opus via an ffmpeg pipe (speech-tuned, mono)"""
+    result = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error",
+         "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+         "-c:a", "libopus", "-b:a", STT_OPUS_BITRATE, "-application", "voip", "-f", "ogg", "pipe:1"],
+        input=pcm, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, timeout=30,
+    )
+    return result.stdout
+
+
+_ENCODERS = {
+    "flac": (encode_flac, "answer.flac"),
+    "opus": (encode_opus, "answer.ogg"),
+    "wav": (encode_wav, "answer.wav"),
+}
+
+
+def encode_for_stt(pcm: bytes, sample_rate: int = 16000, fmt: str = STT_UPLOAD_FORMAT) -> Tuple[bytes, str]:
+    """Encode PCM for upload; returns (payload, filename) with a matching extension"""
+    encoder, filename = _ENCODERS.get(fmt, _ENCODERS["wav"])
+    if encoder is not encode_wav:
+        try:
+            return encoder(pcm, sample_rate), filename
+        except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+            print(f"⚠️ {fmt} encoding failed, sending WAV instead: {e}")
+    return encode_wav(pcm, sample_rate), "answer.wav"
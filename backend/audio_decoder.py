@@ -0,0 +1,200 @@
+"""
+Incremental decoding of browser audio (MediaRecorder WebM/Opus or Ogg/Opus)
+into 16 kHz mono 16-bit PCM for the VAD / STT path.
+
+Each utterance is piped through its own ffmpeg process: container chunks go
+to stdin as they arrive and PCM is read back from stdout by a reader task.
+The pool bounds how many decoders run at once (AUDIO_DECODER_POOL_SIZE) and
+keeps a few ffmpeg processes already started and waiting on stdin
+(AUDIO_DECODER_WARM), so an utterance does not pay process start-up.
+"""
+import os
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from utils import SAMPLE_RATE
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+# Concurrent decoding utterances per worker process
+AUDIO_DECODER_POOL_SIZE = int(os.getenv("AUDIO_DECODER_POOL_SIZE", "32"))
+# Pre-started WebM decoders kept idle
+AUDIO_DECODER_WARM = int(os.getenv("AUDIO_DECODER_WARM", "2"))
+# How long an utterance may wait for a free decoder
+AUDIO_DECODER_ACQUIRE_TIMEOUT = float(os.getenv("AUDIO_DECODER_ACQUIRE_TIMEOUT", "5"))
+# Time allowed to drain the last PCM once the client closes the stream
+AUDIO_DECODER_FLUSH_TIMEOUT = float(os.getenv("AUDIO_DECODER_FLUSH_TIMEOUT", "5"))
+
+# Client-declared encoding -> ffmpeg demuxer
+INPUT_FORMATS = {"webm": "matroska", "ogg": "ogg"}
+
+_READ_SIZE = 64 * 1024
+
+
+class DecoderUnavailableError(RuntimeError):
+    """No decoder could be started (pool exhausted or ffmpeg missing)"""
+
+
+def _ffmpeg_args(encoding: str):
+    return [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error",
+            "-fflags", "nobuffer", "-probesize", "32", "-analyzeduration", "0",
+            "-f", INPUT_FORMATS[encoding], "-i", "pipe:0",
+            "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+
+
+class StreamingDecoder:
+    """One utterance: decode(chunk) returns whatever PCM ffmpeg has produced so far"""
+
+    def __init__(self, pool: "DecoderPool", process: asyncio.subprocess.Process):
+        self._pool = pool
+        self._process = process
+        self._pcm = bytearray()
+        self._released = False
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        while True:
+            data = await self._process.stdout.read(_READ_SIZE)
+            if not data:
+                return
+            self._pcm += data
+
+    def _take(self) -> bytes:
+        pcm = bytes(self._pcm)
+        self._pcm.clear()
+        return pcm
+
+    async def decode(self, chunk: bytes) -> bytes:
+        if self._process.returncode is not None:
+            raise DecoderUnavailableError(f"ffmpeg exited with code {self._process.returncode}")
+        self._process.stdin.write(chunk)
+        # Backpressure: a stalled decoder slows this connection, not the loop
+        await self._process.stdin.drain()
+        return self._take()
+
+    async def close(self) -> bytes:
+        """End of the stream: let ffmpeg flush and return the remaining PCM"""
+        try:
+            if self._process.stdin and not self._process.stdin.is_closing():
+                self._process.stdin.close()
+            await asyncio.wait_for(self._reader, timeout=AUDIO_DECODER_FLUSH_TIMEOUT)
+            await asyncio.wait_for(self._process.wait(), timeout=AUDIO_DECODER_FLUSH_TIMEOUT)
+        except (asyncio.TimeoutError, BrokenPipeError, ConnectionResetError) as e:
+            print(f"⚠️ Audio decoder did not flush cleanly: {e!r}")
+            self.kill()
+        finally:
+            self._release()
+        return self._take()
+
+    def kill(self):
+        if self._process.returncode is None:
+            try:
+                self._process.kill()
+            except ProcessLookupError:
+                pass
+        self._reader.cancel()
+        self._release()
+
+    def _release(self):
+        if not self._released:
+            self._released = True
+            self._pool._release()
+
+
+class DecoderPool:
+    def __init__(self, size: int = AUDIO_DECODER_POOL_SIZE, warm: int = AUDIO_DECODER_WARM):
+        self.size = size
+        self.warm = warm
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: Deque[asyncio.subprocess.Process] = deque()
+        self._refilling = False
+        self.active = 0
+        self.waiting = 0
+        self.counters: Dict[str, int] = {"started": 0, "warm_hits": 0, "busy_rejections": 0, "spawn_failures": 0}
+
+    async def _spawn(self, encoding: str) -> asyncio.subprocess.Process:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *_ffmpeg_args(encoding),
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as e:
+            self.counters["spawn_failures"] += 1
+            raise DecoderUnavailableError(f"Could not start ffmpeg: {e}") from e
+        self.counters["started"] += 1
+        return process
+
+    async def acquire(self, encoding: str) -> StreamingDecoder:
+        if encoding not in INPUT_FORMATS:
+            raise ValueError(f"Unsupported audio encoding: {encoding}")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=AUDIO_DECODER_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.counters["busy_rejections"] += 1
+            raise DecoderUnavailableError("All audio decoders are busy")
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            process = self._take_idle() if encoding == "webm" else None
+            if process is None:
+                process = await self._spawn(encoding)
+            else:
+                self.counters["warm_hits"] += 1
+        except BaseException:
+            self._release()
+            raise
+        self._schedule_refill()
+        return StreamingDecoder(self, process)
+
+    def _take_idle(self) -> Optional[asyncio.subprocess.Process]:
+        while self._idle:
+            process = self._idle.popleft()
+            if process.returncode is None:
+                return process
+        return None
+
+    def _schedule_refill(self):
+        if not self._refilling and len(self._idle) < self.warm:
+            self._refilling = True
+            asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        try:
+            while len(self._idle) < self.warm:
+                self._idle.append(await self._spawn("webm"))
+        except DecoderUnavailableError as e:
+            print(f"⚠️ Audio decoder prewarm failed: {e}")
+        finally:
+            self._refilling = False
+
+    def _release(self):
+        self.active -= 1
+        self._slots.release()
+
+    def start(self):
+        """Prewarm idle decoders (call from the running event loop)"""
+        self._schedule_refill()
+
+    async def stop(self):
+        while self._idle:
+            process = self._idle.popleft()
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "active": self.active,
+            "waiting": self.waiting,
+            "idle_warm": len(self._idle),
+            **self.counters,
+        }
+
+
+decoder_pool = DecoderPool()
@@ -0,0 +1,109 @@
+"""
+Per-connection buffer for candidate audio streamed over the WebSocket.
+
+The browser captures the microphone and sends binary frames between
+{"type": "audio_start"} and {"type": "audio_end"}: either 16 kHz mono
+16-bit little-endian PCM, or MediaRecorder WebM/Ogg Opus chunks that are
+decoded to that PCM by an audio_decoder.StreamingDecoder. Chunks may be any
+size; a vad.StreamingEndpointer buffers the PCM and, with server-side
+endpointing, decides on its own that the candidate has finished speaking.
+"""
+import os
+from typing import Optional, Tuple
+
+from utils import SAMPLE_RATE
+from audio_decoder import StreamingDecoder
+from vad import StreamingEndpointer, UTTERANCE_END, NO_SPEECH, MAX_DURATION
+
+# Hard cap on one utterance; the buffer is finalized when it is reached
+AUDIO_MAX_UTTERANCE_SECONDS = float(os.getenv("AUDIO_MAX_UTTERANCE_SECONDS", "120"))
+
+_CLOSING_EVENTS = (UTTERANCE_END, NO_SPEECH, MAX_DURATION)
+
+
+class AudioStream:
+    """Buffers one utterance at a time; feed() never blocks on I/O"""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._endpointer = StreamingEndpointer(sample_rate=sample_rate,
+                                               max_utterance_seconds=AUDIO_MAX_UTTERANCE_SECONDS)
+        self._decoder: Optional[StreamingDecoder] = None
+        self.active = False
+
+    @property
+    def server_endpointing(self) -> bool:
+        return self._endpointer.endpointing
+
+    def start(self, server_endpointing: bool = True, decoder: Optional[StreamingDecoder] = None):
+        """
+        Begin a new utterance, discarding anything left from the previous one.
+        With a decoder, incoming chunks are container audio, not PCM.
+        """
+        self.cancel()
+        self._decoder = decoder
+        self._endpointer.endpointing = server_endpointing
+        self.active = True
+
+    def cancel(self):
+        if self._decoder is not None:
+            self._decoder.kill()
+            self._decoder = None
+        self._endpointer.reset()
+        # Only connections that are mid-utterance hold a ring buffer
+        self._endpointer.release()
+        self.active = False
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """
+        Append a PCM chunk. Returns an event when the utterance should be
+        finalized (end of speech, no speech at all, or the duration cap),
+        otherwise None.
+        """
+        if not self.active:
+            return None
+        for event in self._endpointer.feed(chunk):
+            if event in _CLOSING_EVENTS:
+                return event
+        return None
+
+    async def receive(self, chunk: bytes) -> Optional[str]:
+        """feed() for a binary frame, decoding it first if the stream is encoded"""
+        if not self.active:
+            return None
+        if self._decoder is None:
+            return self.feed(chunk)
+        return self.feed(await self._decoder.decode(chunk))
+
+    async def flush(self):
+        """Client ended the stream: drain the decoder so the last words are buffered"""
+        if self._decoder is not None:
+            decoder, self._decoder = self._decoder, None
+            self.feed(await decoder.close())
+
+    def finish(self) -> Tuple[bytes, bool]:
+        """
+        Close the utterance and return (pcm, heard_speech). Trailing silence
+        is trimmed, and silence-only audio is reported as no speech so it
+        never reaches transcription.
+        """
+        pcm = self._endpointer.utterance(trim=True)
+        heard_speech = self._endpointer.speech_started
+        self.cancel()
+        return pcm, heard_speech
+
+    @property
+    def duration(self) -> float:
+        return self._endpointer.duration
+
+    @property
+    def speech_started(self) -> bool:
+        return self._endpointer.speech_started
+
+    @property
+    def buffered_samples(self) -> int:
+        return self._endpointer.buffered_samples
+
+    def pcm(self, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Part of the utterance so far, in samples from its start"""
+        return self._endpointer.utterance(offset, length)
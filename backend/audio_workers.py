@@ -0,0 +1,156 @@
+"""
+Dedicated executors for the server's audio work.
+
+Blocking audio calls used to go through asyncio.to_thread, i.e. the event
+loop's default executor, which is shared with everything else that needs a
+thread (evaluation cache disk tier, health checks, ...). A burst of spoken
+answers could then queue ahead of text-only sessions. Audio now has its own
+stages, each with a concurrency cap and a bounded wait queue:
+
+- io:  threads for calls that wait on something else: STT requests and
+       legacy server-side microphone capture (AUDIO_IO_THREADS).
+- cpu: processes for CPU-bound work on whole utterances, i.e. encoding for
+       upload (AUDIO_CPU_PROCESSES; 0 runs it on threads instead).
+
+Streaming VAD stays inline: it is incremental, keeps per-connection state
+and costs microseconds per chunk behind the NumPy energy gate. WebM/Ogg
+decoding already runs in ffmpeg processes (audio_decoder).
+"""
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional, TypeVar
+
+from audio_codec import encode_for_stt
+from stt_backends import GroqSTT, get_backend
+
+AUDIO_IO_THREADS = int(os.getenv("AUDIO_IO_THREADS", "16"))
+AUDIO_IO_MAX_QUEUE = int(os.getenv("AUDIO_IO_MAX_QUEUE", "64"))
+AUDIO_CPU_PROCESSES = int(os.getenv("AUDIO_CPU_PROCESSES", "2"))
+AUDIO_CPU_MAX_QUEUE = int(os.getenv("AUDIO_CPU_MAX_QUEUE", "64"))
+# Thread count for the cpu stage when AUDIO_CPU_PROCESSES=0
+_CPU_THREADS = 2
+
+T = TypeVar("T")
+
+
+class AudioWorkersBusyError(RuntimeError):
+    """A stage's wait queue is full"""
+
+
+class WorkerStage:
+    """An executor behind a semaphore, so waiting work is counted here instead of inside the executor"""
+
+    def __init__(self, name: str, make_executor: Callable[[], Executor], concurrency: int, max_queue: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self._make_executor = make_executor
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.waiting = 0
+        self.counters: Dict[str, int] = {"completed": 0, "failed": 0, "rejected": 0, "max_waiting": 0}
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._executor = self._make_executor()
+        if self.waiting >= self.max_queue:
+            self.counters["rejected"] += 1
+            raise AudioWorkersBusyError(f"Audio {self.name} workers are busy")
+        self.waiting += 1
+        self.counters["max_waiting"] = max(self.counters["max_waiting"], self.waiting)
+        queued_at = time.monotonic()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        wait_ms = (time.monotonic() - queued_at) * 1000
+        self._wait_ms_total += wait_ms
+        self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+        self.active += 1
+        loop = asyncio.get_running_loop()
+        slots = self._slots
+        try:
+            job = self._executor.submit(partial(fn, *args))
+        except BaseException:
+            self._finish(slots, failed=True)
+            raise
+        # The slot is tied to the job, not to this coroutine: if the caller is
+        # cancelled while the job runs, the worker stays busy until it returns
+        job.add_done_callback(lambda f: self._job_done(loop, slots, f))
+        return await asyncio.wrap_future(job)
+
+    def _job_done(self, loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore, job: Future):
+        failed = job.cancelled() or job.exception() is not None
+        try:
+            loop.call_soon_threadsafe(self._finish, slots, failed)
+        except RuntimeError:
+            pass  # event loop already closed
+
+    def _finish(self, slots: asyncio.Semaphore, failed: bool):
+        self.active -= 1
+        self.counters["failed" if failed else "completed"] += 1
+        slots.release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._slots = None
+
+    def stats(self) -> dict:
+        started = self.counters["completed"] + self.counters["failed"]
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "avg_wait_ms": round(self._wait_ms_total / started, 1) if started else 0.0,
+            "max_wait_ms": round(self._wait_ms_max, 1),
+            **self.counters,
+        }
+
+
+def _cpu_executor() -> Executor:
+    if AUDIO_CPU_PROCESSES <= 0:
+        return ThreadPoolExecutor(max_workers=_CPU_THREADS, thread_name_prefix="audio-cpu")
+    # spawn, not fork: the server process already runs threads
+    return ProcessPoolExecutor(max_workers=AUDIO_CPU_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+
+
+class AudioWorkers:
+    def __init__(self):
+        self.io = WorkerStage("io", lambda: ThreadPoolExecutor(max_workers=AUDIO_IO_THREADS, thread_name_prefix="audio-io"),
+                              AUDIO_IO_THREADS, AUDIO_IO_MAX_QUEUE)
+        self.cpu = WorkerStage("cpu", _cpu_executor, AUDIO_CPU_PROCESSES if AUDIO_CPU_PROCESSES > 0 else _CPU_THREADS,
+                               AUDIO_CPU_MAX_QUEUE)
+
+    async def start(self):
+        """Start the cpu stage's workers ahead of the first utterance"""
+        await asyncio.gather(*[self.cpu.run(os.getpid) for _ in range(self.cpu.concurrency)])
+
+    async def transcribe_pcm(self, pcm: bytes, sample_rate: int = 16000) -> str:
+        """Encode on the cpu stage, then wait for the STT backend on the io stage"""
+        backend = get_backend()
+        if isinstance(backend, GroqSTT):
+            payload, filename = await self.cpu.run(encode_for_stt, pcm, sample_rate)
+            return await self.io.run(backend.transcribe, payload, filename)
+        # The local backend takes raw PCM and has its own process pool
+        return await self.io.run(backend.transcribe_pcm, pcm, sample_rate)
+
+    def shutdown(self):
+        self.io.shutdown()
+        self.cpu.shutdown()
+
+    def stats(self) -> dict:
+        return {"io": self.io.stats(), "cpu": self.cpu.stats()}
+
+
+audio_workers = AudioWorkers()
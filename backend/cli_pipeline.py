@@ -0,0 +1,291 @@
+"""
+Pipelined voice loop for the CLI interviews (interview.py and
+interview_with_resume.py).
+
+The microphone is opened once per interview: a capture thread reads the
+PyAudio input stream and hands buffers to the event loop. Stages overlap
+instead of running back to back:
+
+- answers are transcribed in windows while the candidate is still talking
+  (streaming_stt.PartialTranscriber), so only the tail is left at the end;
+- every part of a reply is synthesized as soon as the reply arrives, the
+  next part while the previous one plays;
+- the conversation log is written in a worker thread while the next
+  question is spoken;
+- listening starts with the question, and if the candidate talks over it
+  (barge-in) playback stops and their speech becomes the start of the answer.
+
+There is no echo cancellation, so the interviewer's own voice reaching the
+microphone must not count as barge-in: it needs louder and longer speech
+than normal endpointing (CLI_BARGE_IN_ENERGY, CLI_BARGE_IN_MS).
+CLI_BARGE_IN=false turns it off (e.g. for laptop speakers).
+"""
+import os
+import json
+import uuid
+import asyncio
+import threading
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+import pyaudio
+import sounddevice as sd
+
+import tts_service
+from streaming_stt import PartialTranscriber, STT_PARTIAL_TRANSCRIPTS
+from utils import SAMPLE_RATE, FRAME_DURATION, FRAME_SIZE, CHANNELS, FORMAT, READ_FRAMES, VAD_EVENT_MESSAGES
+from vad import StreamingEndpointer, UTTERANCE_START
+
+CLI_BARGE_IN = os.getenv("CLI_BARGE_IN", "true").lower() in ("1", "true", "yes")
+# RMS (int16 scale) and duration of speech that interrupts playback
+CLI_BARGE_IN_ENERGY = float(os.getenv("CLI_BARGE_IN_ENERGY", "1500"))
+CLI_BARGE_IN_MS = int(os.getenv("CLI_BARGE_IN_MS", "240"))
+CLI_RESULTS_DIR = os.getenv("CLI_RESULTS_DIR", "interview_results")
+
+NO_SPEECH_PROMPT = "I didn't hear anything. Please speak a bit louder or check your microphone."
+REPEAT_PROMPT = "I couldn't understand that. Could you repeat more clearly?"
+STILL_SILENT_PROMPT = "Still couldn't hear you. Try moving closer to the microphone or increasing input volume."
+CLOSING_LINE = "Thank you for the interview. Here is your final feedback."
+MAX_NO_SPEECH_RETRIES = 3
+
+_READ_SIZE = FRAME_SIZE * READ_FRAMES
+
+
+class Microphone:
+    """One PyAudio input stream for the whole interview, read by a capture thread"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._chunks: "asyncio.Queue[bytes]" = asyncio.Queue()
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(format=FORMAT, channels=CHANNELS, rate=SAMPLE_RATE,
+                                        input=True, frames_per_buffer=_READ_SIZE)
+        self._running = True
+        self._thread = threading.Thread(target=self._capture, name="microphone", daemon=True)
+        self._thread.start()
+
+    def _capture(self):
+        while self._running:
+            try:
+                chunk = self._stream.read(_READ_SIZE, exception_on_overflow=False)
+            except OSError as e:
+                print(f"Microphone error: {e}")
+                return
+            self._loop.call_soon_threadsafe(self._chunks.put_nowait, chunk)
+
+    def drain(self):
+        """Drop audio captured while nobody was listening"""
+        while not self._chunks.empty():
+            self._chunks.get_nowait()
+
+    async def read(self) -> bytes:
+        return await self._chunks.get()
+
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1)
+        self._stream.stop_stream()
+        self._stream.close()
+        self._audio.terminate()
+
+
+class InterviewPipeline:
+    """
+    Runs the voice interview loop. `reply_fn(candidate, conversation)` and
+    `transcribe_fn(pcm)` are the blocking calls of the calling script and
+    run in worker threads.
+    """
+
+    def __init__(self, reply_fn: Callable[[str, list], dict], transcribe_fn: Callable[[bytes], str],
+                 is_valid_fn: Callable[[str], bool], conversation: list,
+                 interview_type: str, topics: Optional[List[str]] = None):
+        self.reply_fn = reply_fn
+        self.transcribe_fn = transcribe_fn
+        self.is_valid_fn = is_valid_fn
+        self.conversation = conversation
+        self.interview_id = str(uuid.uuid4())
+        self.interview_type = interview_type
+        self.topics = topics or []
+        self.mic: Optional[Microphone] = None
+        self.partials = PartialTranscriber(lambda pcm: asyncio.to_thread(transcribe_fn, pcm),
+                                           self._print_partial, SAMPLE_RATE)
+        self._speaking = asyncio.Event()
+        self._barged_in = False
+
+    # -- speaking ------------------------------------------------------------
+    async def speak(self, texts: List[str]):
+        """Play `texts` in order; all are synthesized up front, concurrently with playback"""
+        texts = [t for t in texts if t and t.strip()]
+        pending = [asyncio.create_task(asyncio.to_thread(tts_service.synthesize_pcm, t)) for t in texts]
+        self._barged_in = False
+        self._speaking.set()
+        try:
+            for task in pending:
+                try:
+                    data, sample_rate = await task
+                except Exception as e:
+                    print(f"TTS error: {e}")
+                    continue
+                if self._barged_in:
+                    break
+                sd.play(data, sample_rate)
+                await asyncio.to_thread(sd.wait)
+                if self._barged_in:
+                    break
+        finally:
+            self._speaking.clear()
+            for task in pending:
+                task.cancel()
+
+    def _barge_in(self):
+        print("Barge-in: stopping playback")
+        self._barged_in = True
+        sd.stop()
+
+    # -- listening -----------------------------------------------------------
+    async def _print_partial(self, text: str):
+        print(f"… {text}")
+
+    def _new_endpointer(self) -> StreamingEndpointer:
+        print("Listening for speech...")
+        self.partials.reset()
+        self.partials.enabled = STT_PARTIAL_TRANSCRIPTS
+        return StreamingEndpointer(sample_rate=SAMPLE_RATE, frame_ms=FRAME_DURATION)
+
+    async def listen(self) -> Tuple[bytes, bool]:
+        """
+        Record one answer. While the interviewer is speaking, audio only goes
+        to the barge-in detector; the answer's no-speech timer starts once
+        playback ends or is interrupted.
+        """
+        barge = (StreamingEndpointer(sample_rate=SAMPLE_RATE, frame_ms=FRAME_DURATION,
+                                     energy_threshold=CLI_BARGE_IN_ENERGY, start_ms=CLI_BARGE_IN_MS,
+                                     endpointing=False)
+                 if CLI_BARGE_IN else None)
+        endpointer: Optional[StreamingEndpointer] = None
+        while endpointer is None or not endpointer.finished:
+            chunk = await self.mic.read()
+            if endpointer is None:
+                if self._speaking.is_set():
+                    if barge is not None and UTTERANCE_START in barge.feed(chunk):
+                        self._barge_in()
+                        endpointer = self._new_endpointer()
+                        # Keep what the candidate already said over the question
+                        chunk = barge.utterance()
+                    else:
+                        continue
+                else:
+                    endpointer = self._new_endpointer()
+            for event in endpointer.feed(chunk):
+                print(VAD_EVENT_MESSAGES[event])
+            if self.partials.enabled and endpointer.speech_started:
+                self.partials.update(endpointer.utterance, endpointer.buffered_samples)
+        if endpointer.speech_started:
+            return endpointer.utterance(trim=True), True
+        self.partials.cancel()
+        print("No audio recorded")
+        return b"", False
+
+    async def speak_and_listen(self, texts: List[str]) -> Tuple[bytes, bool]:
+        """Speak, listening at the same time so the candidate can cut in"""
+        self.mic.drain()
+        listener = asyncio.create_task(self.listen())
+        try:
+            await self.speak(texts)
+            return await listener
+        finally:
+            listener.cancel()
+
+    async def transcribe(self, pcm: bytes) -> str:
+        if not pcm:
+            return ""
+        if self.partials.enabled:
+            return await self.partials.finalize(pcm)
+        return await asyncio.to_thread(self.transcribe_fn, pcm)
+
+    # -- log -----------------------------------------------------------------
+    def save_log(self, turns: List[dict]):
+        os.makedirs(CLI_RESULTS_DIR, exist_ok=True)
+        path = os.path.join(CLI_RESULTS_DIR, f"interview_results_{self.interview_id}.json")
+        with open(path, "w") as f:
+            json.dump({
+                "interview_id": self.interview_id,
+                "timestamp": datetime.now().isoformat(),
+                "interview_type": self.interview_type,
+                "conversation": turns,
+                "topics": self.topics,
+                "total_interactions": len(turns),
+            }, f, indent=2, default=str)
+
+    # -- main loop -----------------------------------------------------------
+    async def run(self, greeting: str):
+        self.mic = Microphone(asyncio.get_running_loop())
+        try:
+            await self._run(greeting)
+        finally:
+            self.partials.cancel()
+            self.mic.close()
+
+    async def _run(self, greeting: str):
+        print("🎙 Speak when ready...")
+        answer = await self.speak_and_listen([greeting])
+        round_idx = 0
+
+        while True:
+            pcm, heard_speech = answer
+
+            # If VAD didn't detect any speech, prompt user and retry a few times
+            retries = 0
+            while not heard_speech and retries < MAX_NO_SPEECH_RETRIES:
+                print("No speech detected by VAD. Prompted user to speak louder.")
+                pcm, heard_speech = await self.speak_and_listen([NO_SPEECH_PROMPT])
+                retries += 1
+
+            candidate = await self.transcribe(pcm)
+            if not self.is_valid_fn(candidate):
+                print("Transcript invalid or unintelligible. Asking user to repeat.")
+                pcm, heard_speech = await self.speak_and_listen([REPEAT_PROMPT])
+                candidate = await self.transcribe(pcm)
+
+            if not candidate:
+                print("Empty transcript after retries. Skipping this round.")
+                answer = await self.speak_and_listen([STILL_SILENT_PROMPT])
+                continue
+
+            print("Candidate:", candidate)
+            reply = await asyncio.to_thread(self.reply_fn, candidate, self.conversation)
+
+            self.conversation.append({
+                "round": round_idx,
+                "candidate": candidate,
+                "evaluation": reply.get("evaluation", ""),
+                "next_question": reply.get("next_question", ""),
+                "hint": reply.get("hint", ""),
+                "final_feedback": reply.get("final_feedback", "")
+            })
+            # Written while the reply is spoken
+            saving = asyncio.create_task(asyncio.to_thread(self.save_log, list(self.conversation)))
+
+            if reply.get("evaluation"):
+                print("🤖 Evaluation:", reply["evaluation"])
+            if reply.get("hint"):
+                print("🤖 Hint:", reply["hint"])
+            if reply.get("next_question"):
+                print("🤖 Next:", reply["next_question"])
+            spoken = [reply.get("hint", ""), reply.get("next_question", "")]
+
+            if reply.get("final_feedback"):
+                print("🤖 Final Feedback:", reply["final_feedback"])
+                await self.speak(spoken + [CLOSING_LINE])
+                await self._finish_saving(saving)
+                break
+
+            answer = await self.speak_and_listen(spoken)
+            await self._finish_saving(saving)
+            round_idx += 1
+
+    async def _finish_saving(self, saving: asyncio.Task):
+        try:
+            await saving
+        except OSError as e:
+            print(f"Could not save interview log: {e}")
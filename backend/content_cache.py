@@ -0,0 +1,151 @@
+"""
+Content-addressed LRU with an optional on-disk tier.
+
+Shared by the phrase cache (tts_service) and the evaluation cache
+(evaluation_cache). Values are kept as-is in memory; the disk tier stores
+one file per key (`<key><suffix>`), converted with `dumps` / `loads`, and
+is pruned to the `max_disk_entries` most recently used files. Calls that
+touch the disk block; async callers run them in a worker thread.
+"""
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Optional, TypeVar
+
+V = TypeVar("V")
+
+_PRUNE_EVERY = 64
+
+
+def _identity(value):
+    return value
+
+
+class ContentCache(Generic[V]):
+    """Thread-safe LRU keyed by content hash, with an optional on-disk tier"""
+
+    def __init__(self, max_entries: int, directory: Optional[str] = None, max_disk_entries: int = 0,
+                 suffix: str = ".bin", dumps: Callable[[V], bytes] = _identity,
+                 loads: Callable[[bytes], V] = _identity, name: str = "cache"):
+        self._entries: "OrderedDict[str, V]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._directory = directory
+        self._max_disk_entries = max_disk_entries
+        self._suffix = suffix
+        self._dumps = dumps
+        self._loads = loads
+        self._name = name
+        self._disk_writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def has_disk_tier(self) -> bool:
+        return bool(self._directory)
+
+    def get(self, key: str) -> Optional[V]:
+        value = self.get_memory(key)
+        return value if value is not None else self.get_disk(key)
+
+    def get_memory(self, key: str) -> Optional[V]:
+        """Memory tier only; a miss here is not counted, since the disk tier may still have it"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def get_disk(self, key: str) -> Optional[V]:
+        """Disk tier only (blocking); a hit is promoted to memory"""
+        value = self._read(key) if self._directory else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: V):
+        self.put_memory(key, value)
+        if self._directory:
+            self.put_disk(key, value)
+
+    def put_memory(self, key: str, value: V):
+        with self._lock:
+            self._remember(key, value)
+
+    def put_disk(self, key: str, value: V):
+        """Write one entry to the disk tier (blocking)"""
+        try:
+            data = self._dumps(value)
+            fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Could not write {self._name} entry: {e}")
+            return
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % _PRUNE_EVERY == 0
+        if prune:
+            self._prune()
+
+    def _remember(self, key: str, value: V):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key + self._suffix)
+
+    def _read(self, key: str) -> Optional[V]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = self._loads(f.read())
+            os.utime(path)  # mtime doubles as the LRU clock for pruning
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def _prune(self):
+        try:
+            with os.scandir(self._directory) as it:
+                files = [(entry.stat().st_mtime, entry.path) for entry in it if entry.name.endswith(self._suffix)]
+        except OSError:
+            return
+        if len(files) <= self._max_disk_entries:
+            return
+        files.sort()
+        for _, path in files[:len(files) - self._max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def values_size(self, sizeof: Callable[[V], int]) -> int:
+        with self._lock:
+            return sum(sizeof(value) for value in self._entries.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "disk_tier": bool(self._directory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
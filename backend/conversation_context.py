@@ -0,0 +1,188 @@
+"""
+Per-session interviewer context: a compact rolling summary of older turns plus
+the last few turns verbatim, kept under a token budget.
+"""
+import os
+import re
+import json
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+# Turns sent verbatim on every request
+CONTEXT_RECENT_TURNS = int(os.getenv("CONTEXT_RECENT_TURNS", "3"))
+# Approximate token budget for the rendered context (summary + recent turns)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "800"))
+# Characters kept per field of a verbatim recent turn (long answers, code)
+RECENT_FIELD_CHARS = int(os.getenv("CONTEXT_RECENT_FIELD_CHARS", "600"))
+# Characters kept per field when a turn is folded into the summary
+SUMMARY_FIELD_CHARS = int(os.getenv("CONTEXT_SUMMARY_FIELD_CHARS", "140"))
+# Characters kept per field once summary lines are compressed; a merged line
+# shares them evenly between its turns
+SUMMARY_COMPACT_CHARS = int(os.getenv("CONTEXT_SUMMARY_COMPACT_CHARS", "60"))
+# Floor for one turn's share of a field in a merged line
+SUMMARY_MIN_TURN_CHARS = int(os.getenv("CONTEXT_SUMMARY_MIN_TURN_CHARS", "12"))
+# Most turns one merged summary line may cover
+SUMMARY_MAX_SPAN = int(os.getenv("CONTEXT_SUMMARY_MAX_SPAN", "8"))
+
+# Only these fields matter to the interviewer; the rest is bookkeeping
+CONTEXT_FIELDS = ("candidate", "code", "evaluation", "next_question", "hint")
+# Summary keys: C=candidate, E=evaluation, N=next question
+_SUMMARY_KEYS = ("candidate", "evaluation", "next_question")
+_COMPACT_KEYS = ("candidate", "evaluation")
+
+_WHITESPACE_RUN = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English prose)"""
+    return len(text) // 4 + 1
+
+
+def compact_json(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_text(text: str) -> str:
+    """Collapse whitespace runs and blank lines (e.g. PDF-extracted resume text)"""
+    text = _WHITESPACE_RUN.sub(" ", text or "")
+    text = _BLANK_LINES.sub("\n", text)
+    return "\n".join(line.strip() for line in text.split("\n")).strip()
+
+
+def _clean_field(text) -> str:
+    """Drop trailing spaces and blank lines but keep line breaks and indentation (code)"""
+    lines = [line.rstrip() for line in str(text).replace("\r\n", "\n").split("\n")]
+    return _BLANK_LINES.sub("\n", "\n".join(lines)).strip("\n")
+
+
+def _cap(text: str, limit: int = RECENT_FIELD_CHARS) -> str:
+    """Keep the head and tail of an oversized field; the middle is elided"""
+    if len(text) <= limit:
+        return text
+    head = limit * 2 // 3
+    tail = limit - head
+    return f"{text[:head]}\n…[{len(text) - limit} chars omitted]…\n{text[-tail:]}"
+
+
+def _truncate(text: str, limit: int = SUMMARY_FIELD_CHARS) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class _SummaryLine:
+    """
+    Earlier turn(s) in the summary. Each turn keeps its own bounded snippet;
+    rendering re-truncates them evenly, so merging never loses a turn.
+    """
+
+    def __init__(self, turns: List[Tuple[int, Dict[str, str]]]):
+        self.turns = turns
+        self.compact = False
+
+    @property
+    def span(self) -> int:
+        return len(self.turns)
+
+    @classmethod
+    def from_turn(cls, number: int, turn: Dict) -> "_SummaryLine":
+        return cls([(number, {key: _truncate(turn[key]) for key in _SUMMARY_KEYS if turn.get(key)})])
+
+    def compress(self):
+        self.turns = [(number, {key: _truncate(fields[key], SUMMARY_COMPACT_CHARS)
+                                for key in _COMPACT_KEYS if fields.get(key)})
+                      for number, fields in self.turns]
+        self.compact = True
+
+    def can_merge(self, newer: "_SummaryLine") -> bool:
+        return self.compact and newer.compact and self.span + newer.span <= SUMMARY_MAX_SPAN
+
+    def merge(self, newer: "_SummaryLine"):
+        self.turns.extend(newer.turns)
+
+    def render(self) -> str:
+        first, last = self.turns[0][0], self.turns[-1][0]
+        label = f"T{first}" if first == last else f"T{first}-{last}"
+        if self.span == 1:
+            fields = self.turns[0][1]
+        else:
+            width = max(SUMMARY_MIN_TURN_CHARS, SUMMARY_COMPACT_CHARS // self.span)
+            # One entry per turn, in order ("-" where a turn has no such field)
+            fields = {key: " / ".join(_truncate(turn_fields.get(key, ""), width) or "-"
+                                      for _, turn_fields in self.turns)
+                      for key in _COMPACT_KEYS if any(turn_fields.get(key) for _, turn_fields in self.turns)}
+        return label + ": " + " | ".join(f"{key[0].upper()}:{value}" for key, value in fields.items())
+
+
+class ConversationContext:
+    """
+    Drop-in replacement for the plain conversation list: append() records the
+    full turn, render() returns the compact context string for the prompt.
+
+    Over budget, the context shrinks in this order: recent turns are folded
+    into the summary, then summary lines are compressed (oldest first), then
+    the oldest adjacent compressed lines are merged, up to SUMMARY_MAX_SPAN
+    turns per line. Every turn keeps at least SUMMARY_MIN_TURN_CHARS of its
+    answer and evaluation; once every line is at full span the budget is
+    allowed to overflow rather than forget turns. Fields of recent turns are
+    capped at RECENT_FIELD_CHARS, so one long code submission can't crowd
+    out the rest.
+    """
+
+    def __init__(self, recent_turns: int = CONTEXT_RECENT_TURNS, token_budget: int = CONTEXT_TOKEN_BUDGET):
+        self.recent_turns = max(1, recent_turns)
+        self.token_budget = token_budget
+        self.turns: List[Dict] = []  # full history, used for saved results
+        self._recent: Deque[Tuple[int, Dict]] = deque()
+        self._summary: List[_SummaryLine] = []
+        self._rendered = ""
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def __bool__(self) -> bool:
+        return bool(self.turns)
+
+    def __iter__(self):
+        return iter(self.turns)
+
+    def append(self, turn: Dict):
+        self.turns.append(turn)
+        fields = {k: _cap(_clean_field(turn[k])) for k in CONTEXT_FIELDS if turn.get(k)}
+        self._recent.append((len(self.turns), fields))
+        while len(self._recent) > self.recent_turns:
+            self._fold_oldest()
+        self._rendered = self._render()
+        while estimate_tokens(self._rendered) > self.token_budget and self._shrink():
+            self._rendered = self._render()
+
+    def render(self) -> str:
+        return self._rendered
+
+    def _fold_oldest(self):
+        number, turn = self._recent.popleft()
+        self._summary.append(_SummaryLine.from_turn(number, turn))
+
+    def _shrink(self) -> bool:
+        """Free budget: fold recent turns, then compress summary lines, then merge the oldest ones"""
+        if len(self._recent) > 1:
+            self._fold_oldest()
+            return True
+        for line in self._summary:
+            if not line.compact:
+                line.compress()
+                return True
+        for i in range(len(self._summary) - 1):
+            if self._summary[i].can_merge(self._summary[i + 1]):
+                self._summary[i].merge(self._summary.pop(i + 1))
+                return True
+        return False
+
+    def _render(self) -> str:
+        lines = []
+        if self._summary:
+            lines.append("Summary of earlier turns (T=turn, C=candidate, E=evaluation, N=next question):")
+            lines.extend(line.render() for line in self._summary)
+        if self._recent:
+            lines.append("Recent turns: " + compact_json([fields for _, fields in self._recent]))
+        return "\n".join(lines)
@@ -4,8 +4,10 @@ Database configuration and operations for Supabase
 import os
 import json
 import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
@@ -14,6 +16,8 @@ load_dotenv()
 # Initialize Supabase client
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
+# Concurrent Supabase requests; the threads share the client's HTTP connection pool
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "8"))
 
 print(f"🔗 Supabase URL: {SUPABASE_URL}")
 print(f"🔑 Supabase Key status: {'✅ Found' if SUPABASE_ANON_KEY else '❌ Missing'}")
@@ -31,10 +35,25 @@ else:
 
 
 class InterviewDatabase:
-    """Handle all interview-related database operations"""
+    """
+    Handle all interview-related database operations.
+
+    supabase-py is synchronous, so every .execute() runs on a small
+    dedicated thread pool and the methods really are non-blocking for the
+    event loop. Queries are built on the caller's thread; only the HTTP
+    round-trip happens in the pool.
+    """
     
-    def __init__(self):
+    def __init__(self, max_workers: int = DB_MAX_WORKERS):
         self.supabase = supabase
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="supabase")
+    
+    async def _execute(self, query):
+        """Run a query builder's blocking .execute() on the database executor"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, query.execute)
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
         
     async def create_interview_session(self, session_data: Dict[str, Any]) -> Optional[str]:
         """Create a new interview session record"""
@@ -61,7 +80,7 @@ class InterviewDatabase:
                 "created_at": datetime.utcnow().isoformat()
             }
             
-            result = self.supabase.table("interviews").insert(insert_data).execute()
+            result = await self._execute(self.supabase.table("interviews").insert(insert_data))
             
             if result.data:
                 print(f"✅ Interview session created with ID: {result.data[0]['id']}")
@@ -96,7 +115,7 @@ class InterviewDatabase:
             if update_data:
                 update_data["updated_at"] = datetime.utcnow().isoformat()
                 
-                result = self.supabase.table("interviews").update(update_data).eq("session_id", session_id).execute()
+                result = await self._execute(self.supabase.table("interviews").update(update_data).eq("session_id", session_id))
                 
                 if result.data:
                     print(f"✅ Interview progress updated for session: {session_id}")
@@ -157,20 +176,20 @@ class InterviewDatabase:
             
             # First check if the session exists
             try:
-                existing_session = self.supabase.table("interviews").select("session_id, status, created_at").eq("session_id", session_id).execute()
+                existing_session = await self._execute(self.supabase.table("interviews").select("session_id, status, created_at").eq("session_id", session_id))
                 if existing_session.data and len(existing_session.data) > 0:
                     print(f"✅ Session found: {existing_session.data[0]}")
                 else:
                     print(f"❌ Session {session_id} not found in database!")
                     print("🔍 Checking recent sessions...")
-                    recent = self.supabase.table("interviews").select("session_id, created_at").order("created_at", desc=True).limit(5).execute()
+                    recent = await self._execute(self.supabase.table("interviews").select("session_id, created_at").order("created_at", desc=True).limit(5))
                     for r in recent.data:
                         print(f"   📝 {r.get('session_id')} - {r.get('created_at')}")
                     return False
             except Exception as e:
                 print(f"❌ Error checking session existence: {e}")
             
-            result = self.supabase.table("interviews").update(update_data).eq("session_id", session_id).execute()
+            result = await self._execute(self.supabase.table("interviews").update(update_data).eq("session_id", session_id))
             
             if result.data and len(result.data) > 0:
                 print(f"✅ Interview completed successfully for session: {session_id}")
@@ -191,7 +210,7 @@ class InterviewDatabase:
             return None
             
         try:
-            result = self.supabase.table("interviews").select("*").eq("session_id", session_id).execute()
+            result = await self._execute(self.supabase.table("interviews").select("*").eq("session_id", session_id))
             
             if result.data and len(result.data) > 0:
                 interview_data = result.data[0]
@@ -230,7 +249,7 @@ class InterviewDatabase:
             return []
             
         try:
-            result = self.supabase.table("interviews").select("*").order("created_at", desc=True).limit(limit).execute()
+            result = await self._execute(self.supabase.table("interviews").select("*").order("created_at", desc=True).limit(limit))
             
             if result.data:
                 return result.data
@@ -241,37 +260,47 @@ class InterviewDatabase:
             print(f"❌ Error getting all interviews: {e}")
             return []
     
+    @staticmethod
+    def _question_response_row(session_id: str, question_index: int, question_data: Dict[str, Any]) -> Dict[str, Any]:
+        # question_index expected to be 1-based from caller
+        return {
+            "session_id": session_id,
+            "question_index": int(question_index),
+            "question_text": question_data.get("question"),
+            "user_response": question_data.get("user_response"),
+            "score": question_data.get("score"),
+            "feedback": question_data.get("feedback"),
+            "time_taken": question_data.get("time_taken"),
+            "hints_used": question_data.get("hints_used", 0),
+            "difficulty": question_data.get("difficulty"),
+            "created_at": question_data.get("created_at") or datetime.utcnow().isoformat()
+        }
+    
     async def store_question_response(self, session_id: str, question_index: int, question_data: Dict[str, Any]) -> bool:
         """Store individual question and response data"""
+        return await self.store_question_responses(session_id, [(question_index, question_data)])
+    
+    async def store_question_responses(self, session_id: str, responses: List[Tuple[int, Dict[str, Any]]]) -> bool:
+        """Store several (question_index, question_data) responses in one multi-row insert"""
         if not self.supabase:
             return False
+        if not responses:
+            return True
             
         try:
-            # question_index expected to be 1-based from caller
-            insert_data = {
-                "session_id": session_id,
-                "question_index": int(question_index),
-                "question_text": question_data.get("question"),
-                "user_response": question_data.get("user_response"),
-                "score": question_data.get("score"),
-                "feedback": question_data.get("feedback"),
-                "time_taken": question_data.get("time_taken"),
-                "hints_used": question_data.get("hints_used", 0),
-                "difficulty": question_data.get("difficulty"),
-                "created_at": datetime.utcnow().isoformat()
-            }
-            
-            result = self.supabase.table("question_responses").insert(insert_data).execute()
+            rows = [self._question_response_row(session_id, index, data) for index, data in responses]
+            result = await self._execute(self.supabase.table("question_responses").insert(rows))
             
             if result.data:
-                print(f"✅ Question response stored for session: {session_id}, question: {question_index}")
+                indexes = ", ".join(str(row["question_index"]) for row in rows)
+                print(f"✅ Question responses stored for session: {session_id}, questions: {indexes}")
                 return True
             else:
-                print(f"❌ Failed to store question response")
+                print(f"❌ Failed to store question responses")
                 return False
                 
         except Exception as e:
-            print(f"❌ Error storing question response: {e}")
+            print(f"❌ Error storing question responses: {e}")
             return False
     
     async def get_question_responses(self, session_id: str) -> List[Dict[str, Any]]:
@@ -281,7 +310,7 @@ class InterviewDatabase:
             
         try:
             # return ordered by question_index (which is 1-based)
-            result = self.supabase.table("question_responses").select("*").eq("session_id", session_id).order("question_index").execute()
+            result = await self._execute(self.supabase.table("question_responses").select("*").eq("session_id", session_id).order("question_index"))
             
             if result.data:
                 return result.data
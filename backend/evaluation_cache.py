@@ -0,0 +1,81 @@
+"""
+Content-addressed cache for code-submission evaluations.
+
+The key is a SHA-256 of the question text, the whitespace-normalized code,
+the language and the scoring-relevant context reduced to the buckets the
+evaluation prompt actually distinguishes (minutes over the time allowance,
+hints used, whether the approach was discussed). Entries live in an
+in-memory LRU and, when EVAL_CACHE_DIR is set, in one JSON file per key
+(content_cache.ContentCache).
+"""
+import os
+import json
+import asyncio
+import hashlib
+from typing import Optional
+
+from content_cache import ContentCache
+
+# Evaluations kept in memory
+EVAL_CACHE_SIZE = int(os.getenv("EVAL_CACHE_SIZE", "512"))
+# Directory for the on-disk tier; unset keeps the cache memory-only
+EVAL_CACHE_DIR = os.getenv("EVAL_CACHE_DIR")
+# Files kept in the on-disk tier (least recently used are pruned)
+EVAL_CACHE_DISK_ENTRIES = int(os.getenv("EVAL_CACHE_DISK_ENTRIES", "10000"))
+
+# Minutes allowed before the time penalty applies (mirrors the evaluation prompt)
+TIME_ALLOWANCE_MINUTES = 10
+
+
+def normalize_code(code: str) -> str:
+    """Drop trailing whitespace and blank lines; indentation is kept since it can be significant"""
+    lines = (line.rstrip() for line in code.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def time_bucket(time_spent_ms: int) -> int:
+    """Whole minutes over the allowance; every submission inside it shares bucket 0"""
+    return max(0, int(time_spent_ms / 60000) - TIME_ALLOWANCE_MINUTES)
+
+
+def evaluation_key(question: str, code: str, language: str, time_spent_ms: int,
+                   hints_used: int, approach_discussed: bool) -> str:
+    payload = json.dumps([question.strip(), normalize_code(code), language.lower(),
+                          time_bucket(time_spent_ms), hints_used, bool(approach_discussed)],
+                         separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _dump_evaluation(evaluation: dict) -> bytes:
+    return json.dumps(evaluation).encode("utf-8")
+
+
+class EvaluationCache:
+    """Async front for a ContentCache of evaluation payloads; disk reads and writes run in a worker thread"""
+
+    def __init__(self, max_entries: int = EVAL_CACHE_SIZE, directory: Optional[str] = EVAL_CACHE_DIR,
+                 max_disk_entries: int = EVAL_CACHE_DISK_ENTRIES):
+        self._cache: ContentCache[dict] = ContentCache(max_entries, directory, max_disk_entries, suffix=".json",
+                                                       dumps=_dump_evaluation, loads=json.loads,
+                                                       name="evaluation cache")
+
+    async def get(self, key: str) -> Optional[dict]:
+        evaluation = self._cache.get_memory(key)
+        if evaluation is None:
+            if self._cache.has_disk_tier:
+                evaluation = await asyncio.to_thread(self._cache.get_disk, key)
+            else:
+                evaluation = self._cache.get_disk(key)  # counts the miss
+        return dict(evaluation) if evaluation is not None else None
+
+    async def put(self, key: str, evaluation: dict):
+        evaluation = dict(evaluation)
+        self._cache.put_memory(key, evaluation)
+        if self._cache.has_disk_tier:
+            await asyncio.to_thread(self._cache.put_disk, key, evaluation)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+evaluation_cache = EvaluationCache()
@@ -0,0 +1,62 @@
+"""
+Shared Groq clients.
+
+Both clients are built on first use rather than at import, so importing the
+server never waits on the network, and every module shares the same pooled
+HTTP connections. A failed call no longer disables the client; transient
+provider errors are handled by the circuit breaker in llm_resilience.
+"""
+import os
+import threading
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+from groq import AsyncGroq, Groq
+
+load_dotenv()
+
+# Keep-alive connections shared by all LLM / STT calls in this process
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "64"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "32"))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "60"))
+
+_lock = threading.Lock()
+_client: Optional[Groq] = None
+_async_client: Optional[AsyncGroq] = None
+
+
+def api_key() -> Optional[str]:
+    return os.getenv("GROQ_API_KEY")
+
+
+def is_configured() -> bool:
+    return bool(api_key())
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=GROQ_MAX_CONNECTIONS,
+                        max_keepalive_connections=GROQ_MAX_KEEPALIVE,
+                        keepalive_expiry=GROQ_KEEPALIVE_EXPIRY)
+
+
+def get_client() -> Optional[Groq]:
+    """Process-wide sync client (CLI scripts, thread-pool STT); None without an API key"""
+    global _client
+    if _client is None and is_configured():
+        with _lock:
+            if _client is None:
+                _client = Groq(api_key=api_key(), http_client=httpx.Client(limits=_limits()))
+                print("✅ Groq client initialized")
+    return _client
+
+
+def get_async_client() -> Optional[AsyncGroq]:
+    """Process-wide async client used by llm_gateway; None without an API key"""
+    global _async_client
+    if _async_client is None and is_configured():
+        with _lock:
+            if _async_client is None:
+                _async_client = AsyncGroq(api_key=api_key(), http_client=httpx.AsyncClient(limits=_limits()))
+                print("✅ Async Groq client initialized")
+    return _async_client
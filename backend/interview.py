@@ -1,33 +1,28 @@
 import os
+import asyncio
 import time
-import json
+from typing import Union
 import sounddevice as sd
 import soundfile as sf
 import numpy as np
 import webrtcvad
 import pyaudio
-from groq import Groq
-from gtts import gTTS
+from groq_client import get_client
+from stt_backends import get_backend
+from cli_pipeline import InterviewPipeline
 from dotenv import load_dotenv
+import llm_gateway
+from json_stream import JsonFieldStream
+from conversation_context import ConversationContext, compact_json
+from llm_resilience import LLM_CALL_TIMEOUT, call_sync
+from model_routing import resolve_route
+from structured_output import INTERVIEWER_REPLY_SCHEMA, json_mode_kwargs, parse_structured
 from utils import build_interviewer_prompt, get_user_topics, record_with_vad
 
 # --- Load env ---
 load_dotenv()
 
-# Initialize Groq client with error handling
-api_key = os.getenv("GROQ_API_KEY")
-if not api_key:
-    print("❌ GROQ_API_KEY not found in environment variables for interview.py")
-    client = None
-else:
-    try:
-        client = Groq(api_key=api_key)
-        print("✅ Groq client initialized successfully in interview.py")
-    except Exception as e:
-        print(f"❌ Failed to initialize Groq client in interview.py: {e}")
-        client = None
-
-conversation = []
+conversation = ConversationContext()
 # --- Prompt for LLM ---
 INTERVIEWER_PROMPT = ""
 
@@ -68,51 +63,91 @@ def test_vad_recording():
         print(f"Could not delete test file: {e}")
     # Also test the retry prompt flow by simulating a no-speech scenario is manual testing
 
-# --- TTS using gTTS ---
-def say(text: str, filename="out.mp3"):
-    if not text.strip():
-        return
-    try:
-        tts = gTTS(text=text, lang="en")
-        tts.save(filename)
-        data, sr = sf.read(filename, dtype="float32")
-        sd.play(data, sr); sd.wait()
-    except Exception as e:
-        print(f"TTS error: {e}")
+# --- STT (Groq Whisper or local faster-whisper, see stt_backends) ---
+def transcribe(audio: Union[str, bytes], filename: str = "answer.wav") -> str:
+    """Transcribe an audio file path or an encoded payload already in memory"""
+    if isinstance(audio, str):
+        filename = os.path.basename(audio)
+        with open(audio, "rb") as f:
+            audio = f.read()
+    return get_backend().transcribe(audio, filename)
 
-# --- STT with Groq Whisper ---
-def transcribe(path: str) -> str:
-    with open(path, "rb") as f:
-        result = client.audio.transcriptions.create(
-            file=(path, f.read()),
-            model="whisper-large-v3-turbo"
-        )
-    return getattr(result, "text", "").strip()
+def transcribe_pcm(pcm: bytes, sample_rate: int = 16000) -> str:
+    """Transcribe raw 16-bit mono PCM without writing it to disk"""
+    return get_backend().transcribe_pcm(pcm, sample_rate)
 
 # --- LLM Interview Brain ---
-def interviewer_reply(candidate: str, context: list) -> dict:
-    # Use the global INTERVIEWER_PROMPT if topics not set
-    global INTERVIEWER_PROMPT
-    context_str = json.dumps(context[-3:], indent=2) if context else ""
-    msg = [
-        {"role": "system", "content": INTERVIEWER_PROMPT},
+# Fields pushed to the client as they are generated when streaming
+STREAMED_REPLY_FIELDS = ("evaluation", "next_question")
+
+FALLBACK_REPLY = {
+    "evaluation": "Good attempt, but please elaborate.",
+    "next_question": "What are your thoughts on data structures?",
+    "hint": "",
+    "final_feedback": ""
+}
+
+def build_reply_messages(candidate: str, context: list, prompt: str = None) -> list:
+    # Use the global INTERVIEWER_PROMPT if no session prompt is given
+    if isinstance(context, ConversationContext):
+        context_str = context.render()
+    else:
+        context_str = compact_json(context[-3:]) if context else ""
+    return [
+        {"role": "system", "content": prompt if prompt is not None else INTERVIEWER_PROMPT},
         {"role": "user", "content": f"Conversation so far: {context_str}\nCandidate: {candidate}"}
     ]
-    res = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=msg,
-        temperature=0.3,
-        max_tokens=500
-    )
+
+def interviewer_reply(candidate: str, context: list, prompt: str = None) -> dict:
+    """Blocking interviewer reply for the CLI scripts; FALLBACK_REPLY on any failure"""
+    msg = build_reply_messages(candidate, context, prompt)
+    try:
+        client = get_client()
+        if client is None:
+            raise RuntimeError("Groq client not available")
+        # Skips the provider entirely while it is degraded (CircuitOpenError)
+        res = call_sync(lambda: client.chat.completions.create(
+            model=resolve_route("interviewer_reply").model,
+            messages=msg,
+            temperature=0.3,
+            max_tokens=500,
+            timeout=LLM_CALL_TIMEOUT,
+            **json_mode_kwargs()
+        ))
+        return parse_structured(res.choices[0].message.content, INTERVIEWER_REPLY_SCHEMA)
+    except Exception as e:
+        print(f"Error in interviewer reply: {e}")
+        return dict(FALLBACK_REPLY)
+
+async def interviewer_reply_async(candidate: str, context: list, prompt: str = None, on_delta=None) -> dict:
+    """Non-blocking interviewer_reply for the WebSocket server (goes through llm_gateway).
+
+    When on_delta is given the completion is streamed and on_delta(field, text)
+    is awaited for every partial "evaluation" / "next_question" chunk.
+    """
+    msg = build_reply_messages(candidate, context, prompt)
+    fields = None
     try:
-        return json.loads(res.choices[0].message.content)
-    except Exception:
-        return {
-            "evaluation": "Good attempt, but please elaborate.",
-            "next_question": "What are your thoughts on data structures?",
-            "hint": "",
-            "final_feedback": ""
-        }
+        if on_delta is None:
+            content = await llm_gateway.chat_completion(msg, temperature=0.3, max_tokens=500, call_site="interviewer_reply",
+                                                      **json_mode_kwargs())
+        else:
+            fields = JsonFieldStream(STREAMED_REPLY_FIELDS)
+            parts = []
+            async for chunk in llm_gateway.chat_completion_stream(msg, temperature=0.3, max_tokens=500,
+                                                                   call_site="interviewer_reply"):
+                parts.append(chunk)
+                for field, delta in fields.feed(chunk):
+                    await on_delta(field, delta)
+            content = "".join(parts)
+        return parse_structured(content, INTERVIEWER_REPLY_SCHEMA)
+    except Exception as e:
+        print(f"Error in interviewer reply: {e}")
+        reply = dict(FALLBACK_REPLY)
+        if fields is not None:
+            # Keep whatever was already streamed to the client so the final message matches it
+            reply.update({k: v for k, v in fields.values().items() if v})
+        return reply
 
 # --- Main Loop ---
 def run_interview():
@@ -128,71 +163,9 @@ def run_interview():
     )
     INTERVIEWER_PROMPT = build_interviewer_prompt(topics)
 
-    say("Hello, I'm CodeSage, your AI interviewer. Can you introduce yourself?")
-    round_idx = 0
-
-    while True:
-        filename = f"ans{round_idx}.wav"
-        print("🎙 Speak when ready...")
-        filename, heard_speech = record_with_vad(filename)
-
-        # If VAD didn't detect any speech, prompt user and retry a few times
-        retries = 0
-        max_retries = 3
-        while not heard_speech and retries < max_retries:
-            say("I didn't hear anything. Please speak a bit louder or check your microphone.")
-            print("No speech detected by VAD. Prompted user to speak louder.")
-            filename, heard_speech = record_with_vad(filename)
-            retries += 1
-
-        candidate = transcribe(filename)
-        # Validate transcript quality
-        if not transcript_is_valid(candidate):
-            # Give one more retry if transcript looks invalid
-            say("I couldn't understand that. Could you repeat more clearly?")
-            print("Transcript invalid or unintelligible. Asking user to repeat.")
-            filename, heard_speech = record_with_vad(filename)
-            candidate = transcribe(filename)
-        # Delete the answer audio file after transcription
-        try:
-            os.remove(filename)
-        except Exception as e:
-            print(f"Warning: Could not delete {filename}: {e}")
-
-        if not candidate:
-            # After retrying above, if still empty, give a hint and continue
-            say("Still couldn't hear you. Try moving closer to the microphone or increasing input volume.")
-            print("Empty transcript after retries. Skipping this round.")
-            continue
-
-        print("Candidate:", candidate)
-        reply = interviewer_reply(candidate, conversation)
-
-        # Store conversation
-        conversation.append({
-            "round": round_idx,
-            "candidate": candidate,
-            "evaluation": reply.get("evaluation", ""),
-            "next_question": reply.get("next_question", ""),
-            "hint": reply.get("hint", ""),
-            "final_feedback": reply.get("final_feedback", "")
-        })
-
-        # Speak feedback + question
-        if reply.get("evaluation"):
-            print("🤖 Evaluation:", reply["evaluation"])
-        if reply.get("hint"):
-            print("🤖 Hint:", reply["hint"])
-            say(reply["hint"])
-        if reply.get("next_question"):
-            print("🤖 Next:", reply["next_question"])
-            say(reply["next_question"])
-        if reply.get("final_feedback"):
-            print("🤖 Final Feedback:", reply["final_feedback"])
-            say("Thank you for the interview. Here is your final feedback.")
-            break
-
-        round_idx += 1
+    pipeline = InterviewPipeline(interviewer_reply, transcribe_pcm, transcript_is_valid, conversation,
+                                 interview_type="topics", topics=topics)
+    asyncio.run(pipeline.run("Hello, I'm CodeSage, your AI interviewer. Can you introduce yourself?"))
 
 if __name__ == "__main__":
     print("Select mode:")
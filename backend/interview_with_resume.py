@@ -1,14 +1,17 @@
 import os
+import asyncio
 import time
-import json
+from typing import Union
 import sounddevice as sd
 import soundfile as sf
 import numpy as np
 import webrtcvad
 import pyaudio
-from groq import Groq
-from gtts import gTTS
+from stt_backends import get_backend
+from cli_pipeline import InterviewPipeline
 from dotenv import load_dotenv
+from conversation_context import ConversationContext, compact_text
+from interview import interviewer_reply as shared_interviewer_reply
 from utils import get_user_topics, record_with_vad
 
 # --- Resume reading function ---
@@ -35,20 +38,7 @@ def read_resume(resume_path):
 # --- Load env ---
 load_dotenv()
 
-# Initialize Groq client with error handling
-api_key = os.getenv("GROQ_API_KEY")
-if not api_key:
-    print("❌ GROQ_API_KEY not found in environment variables for interview_with_resume.py")
-    client = None
-else:
-    try:
-        client = Groq(api_key=api_key)
-        print("✅ Groq client initialized successfully in interview_with_resume.py")
-    except Exception as e:
-        print(f"❌ Failed to initialize Groq client in interview_with_resume.py: {e}")
-        client = None
-
-conversation = []
+conversation = ConversationContext()
 # --- Prompt for LLM ---
 INTERVIEWER_PROMPT = ""
 
@@ -89,57 +79,29 @@ def test_vad_recording():
         print(f"Could not delete test file: {e}")
     # Also test the retry prompt flow by simulating a no-speech scenario is manual testing
 
-# --- TTS using gTTS ---
-def say(text: str, filename="out.mp3"):
-    if not text.strip():
-        return
-    try:
-        tts = gTTS(text=text, lang="en")
-        tts.save(filename)
-        data, sr = sf.read(filename, dtype="float32")
-        sd.play(data, sr); sd.wait()
-    except Exception as e:
-        print(f"TTS error: {e}")
+# --- STT (Groq Whisper or local faster-whisper, see stt_backends) ---
+def transcribe(audio: Union[str, bytes], filename: str = "answer.wav") -> str:
+    """Transcribe an audio file path or an encoded payload already in memory"""
+    if isinstance(audio, str):
+        filename = os.path.basename(audio)
+        with open(audio, "rb") as f:
+            audio = f.read()
+    return get_backend().transcribe(audio, filename)
 
-# --- STT with Groq Whisper ---
-def transcribe(path: str) -> str:
-    with open(path, "rb") as f:
-        result = client.audio.transcriptions.create(
-            file=(path, f.read()),
-            model="whisper-large-v3-turbo"
-        )
-    return getattr(result, "text", "").strip()
+def transcribe_pcm(pcm: bytes, sample_rate: int = 16000) -> str:
+    """Transcribe raw 16-bit mono PCM without writing it to disk"""
+    return get_backend().transcribe_pcm(pcm, sample_rate)
 
 # --- LLM Interview Brain ---
 def interviewer_reply(candidate: str, context: list) -> dict:
-    # Use the global INTERVIEWER_PROMPT if topics not set
-    global INTERVIEWER_PROMPT
-    context_str = json.dumps(context[-3:], indent=2) if context else ""
-    msg = [
-        {"role": "system", "content": INTERVIEWER_PROMPT},
-        {"role": "user", "content": f"Conversation so far: {context_str}\nCandidate: {candidate}"}
-    ]
-    res = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=msg,
-        temperature=0.3,
-        max_tokens=500
-    )
-    try:
-        return json.loads(res.choices[0].message.content)
-    except Exception:
-        return {
-            "evaluation": "Good attempt, but please elaborate.",
-            "next_question": "What are your thoughts on data structures?",
-            "hint": "",
-            "final_feedback": ""
-        }
+    # Same call and fallback as interview.py, with this script's resume-based prompt
+    return shared_interviewer_reply(candidate, context, INTERVIEWER_PROMPT)
 
 # --- Main Loop ---
 def run_interview():
     # --- Ask for resume path ---
     resume_path = input("Enter path to your resume (.txt or .pdf): ").strip()
-    resume_text = read_resume(resume_path)
+    resume_text = compact_text(read_resume(resume_path))
     if not resume_text:
         print("Could not read resume. Exiting.")
         return
@@ -198,71 +160,9 @@ Resume:
 {resume_text}
 """
 
-    say("Hello, I'm Code-Win, your AI interviewer. I will ask you questions based on your resume. Can you introduce yourself?")
-    round_idx = 0
-
-    while True:
-        filename = f"ans{round_idx}.wav"
-        print("🎙 Speak when ready...")
-        filename, heard_speech = record_with_vad(filename)
-
-        # If VAD didn't detect any speech, prompt user and retry a few times
-        retries = 0
-        max_retries = 3
-        while not heard_speech and retries < max_retries:
-            say("I didn't hear anything. Please speak a bit louder or check your microphone.")
-            print("No speech detected by VAD. Prompted user to speak louder.")
-            filename, heard_speech = record_with_vad(filename)
-            retries += 1
-
-        candidate = transcribe(filename)
-        # Validate transcript quality
-        if not transcript_is_valid(candidate):
-            # Give one more retry if transcript looks invalid
-            say("I couldn't understand that. Could you repeat more clearly?")
-            print("Transcript invalid or unintelligible. Asking user to repeat.")
-            filename, heard_speech = record_with_vad(filename)
-            candidate = transcribe(filename)
-        # Delete the answer audio file after transcription
-        try:
-            os.remove(filename)
-        except Exception as e:
-            print(f"Warning: Could not delete {filename}: {e}")
-
-        if not candidate:
-            # After retrying above, if still empty, give a hint and continue
-            say("Still couldn't hear you. Try moving closer to the microphone or increasing input volume.")
-            print("Empty transcript after retries. Skipping this round.")
-            continue
-
-        print("Candidate:", candidate)
-        reply = interviewer_reply(candidate, conversation)
-
-        # Store conversation
-        conversation.append({
-            "round": round_idx,
-            "candidate": candidate,
-            "evaluation": reply.get("evaluation", ""),
-            "next_question": reply.get("next_question", ""),
-            "hint": reply.get("hint", ""),
-            "final_feedback": reply.get("final_feedback", "")
-        })
-
-        # Speak feedback + question
-        if reply.get("evaluation"):
-            print("🤖 Evaluation:", reply["evaluation"])
-        if reply.get("hint"):
-            print("🤖 Hint:", reply["hint"])
-            say(reply["hint"])
-        if reply.get("next_question"):
-            print("🤖 Next:", reply["next_question"])
-            say(reply["next_question"])
-        if reply.get("final_feedback"):
-            print("🤖 Final Feedback:", reply["final_feedback"])
-            say("Thank you for the interview. Here is your final feedback.")
-            break
-
-        round_idx += 1
+    pipeline = InterviewPipeline(interviewer_reply, transcribe_pcm, transcript_is_valid, conversation,
+                                 interview_type="resume")
+    asyncio.run(pipeline.run("Hello, I'm Code-Win, your AI interviewer. I will ask you questions based on your resume. Can you introduce yourself?"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+"""
+Incremental extraction of top-level string fields from a JSON object that is
+still being generated, so partial values can be forwarded while tokens arrive.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_SIMPLE_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JsonFieldStream:
+    """
+    Feed raw completion text chunk by chunk; feed() returns (field, delta)
+    pairs for the watched top-level string fields. Anything outside the
+    outermost object (markdown fences, chatter) is ignored.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = set(fields)
+        self._values: Dict[str, List[str]] = {}
+        self._containers: List[str] = []  # stack of "{" / "["
+        self._expect_key = False
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._unicode_digits: Optional[str] = None
+        self._key_chars: List[str] = []
+        self._last_key: Optional[str] = None
+        self._streaming_field: Optional[str] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        deltas: Dict[str, List[str]] = {}
+        for c in chunk:
+            if self._in_string:
+                self._consume_string_char(c, deltas)
+            elif c == '"':
+                self._open_string()
+            elif c in '{[':
+                self._containers.append(c)
+                self._expect_key = c == '{'
+            elif c in '}]':
+                if self._containers:
+                    self._containers.pop()
+            elif c == ':':
+                self._expect_key = False
+            elif c == ',':
+                self._expect_key = bool(self._containers) and self._containers[-1] == '{'
+        return [(field, "".join(parts)) for field, parts in deltas.items()]
+
+    def value(self, field: str) -> str:
+        return "".join(self._values.get(field, []))
+
+    def values(self) -> Dict[str, str]:
+        return {field: "".join(parts) for field, parts in self._values.items()}
+
+    def _open_string(self):
+        self._in_string = True
+        top_level = len(self._containers) == 1 and self._containers[0] == '{'
+        self._string_is_key = top_level and self._expect_key
+        self._key_chars = []
+        self._streaming_field = None
+        if top_level and not self._expect_key and self._last_key in self.fields:
+            self._streaming_field = self._last_key
+            self._values[self._last_key] = []
+
+    def _consume_string_char(self, c: str, deltas: Dict[str, List[str]]):
+        if self._unicode_digits is not None:
+            self._unicode_digits += c
+            if len(self._unicode_digits) == 4:
+                try:
+                    decoded = chr(int(self._unicode_digits, 16))
+                except ValueError:
+                    decoded = ""
+                self._unicode_digits = None
+                self._emit(decoded, deltas)
+            return
+        if self._escape:
+            self._escape = False
+            if c == 'u':
+                self._unicode_digits = ""
+            else:
+                self._emit(_SIMPLE_ESCAPES.get(c, c), deltas)
+            return
+        if c == '\\':
+            self._escape = True
+        elif c == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._last_key = "".join(self._key_chars)
+            self._streaming_field = None
+        else:
+            self._emit(c, deltas)
+
+    def _emit(self, text: str, deltas: Dict[str, List[str]]):
+        if not text:
+            return
+        if self._string_is_key:
+            self._key_chars.append(text)
+        elif self._streaming_field is not None:
+            self._values[self._streaming_field].append(text)
+            deltas.setdefault(self._streaming_field, []).append(text)
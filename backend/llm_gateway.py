@@ -0,0 +1,247 @@
+"""
+Async LLM gateway shared by all WebSocket handlers.
+
+Every chat completion issued from the server goes through this module so the
+uvicorn event loop never blocks on a provider round-trip.
+"""
+import os
+import time
+import asyncio
+from typing import AsyncIterator, Callable, Optional, Dict, List, Any
+import groq_client
+from llm_scheduler import Priority, scheduler, estimate_prompt_tokens
+from llm_resilience import LLM_CALL_TIMEOUT, LLM_STREAM_IDLE_TIMEOUT, call_with_resilience, provider_breaker, is_provider_failure
+from structured_output import Schema, StructuredOutputError, json_mode_kwargs, parse_structured
+from model_routing import MODEL_TIERS, resolve_route, record_escalation
+
+DEFAULT_MODEL = MODEL_TIERS["large"]
+
+# Upper bound on in-flight provider requests per worker process
+MAX_CONCURRENT_REQUESTS = int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", "32"))
+
+_request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when no LLM client is configured"""
+
+
+def is_available() -> bool:
+    return groq_client.is_configured()
+
+
+def is_degraded() -> bool:
+    """True while the circuit breaker is open; callers should use their fallbacks directly"""
+    return provider_breaker.is_open()
+
+
+async def probe_provider(timeout: float = 5.0) -> dict:
+    """
+    Cheap readiness check (model listing, no completion tokens). It does not
+    touch the circuit breaker, so a failed probe never disables LLM calls.
+    """
+    async_client = groq_client.get_async_client()
+    if not async_client:
+        return {"ok": False, "error": "GROQ_API_KEY not configured"}
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(async_client.models.list(), timeout=timeout)
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+async def chat_completion(messages: List[Dict[str, str]],
+                          model: Optional[str] = None,
+                          temperature: float = 0.3,
+                          max_tokens: int = 500,
+                          priority: Priority = Priority.INTERVIEWER_REPLY,
+                          deadline: float = LLM_CALL_TIMEOUT,
+                          call_site: Optional[str] = None,
+                          validate: Optional[Callable[[str], bool]] = None,
+                          **kwargs: Any) -> str:
+    """
+    Run a chat completion without blocking the event loop and return the
+    message content ("" when the provider returns nothing). The call waits in
+    the scheduler for its priority class and the model's rate budget first,
+    then runs under what is left of `deadline` (hedged past p95 when
+    LLM_HEDGE_ENABLED); the deadline starts before the queue wait.
+    Raises CircuitOpenError without touching the provider while it is degraded.
+
+    Without an explicit `model`, the model comes from the routing table for
+    `call_site`; if `validate` rejects the reply and the route has an
+    escalation tier, the call is retried once on that model within what is
+    left of the same `deadline`.
+    """
+    route = resolve_route(call_site)
+    started = time.monotonic()
+    content = await _complete(messages, model or route.model, temperature, max_tokens, priority, deadline, **kwargs)
+    if validate is not None and not model and route.escalation_model and not validate(content):
+        print(f"⤴️ Escalating {call_site} from {route.model} to {route.escalation_model}")
+        record_escalation(call_site)
+        content = await _complete(messages, route.escalation_model, temperature, max_tokens, priority,
+                                  _remaining(deadline, started), **kwargs)
+    return content
+
+
+def _remaining(deadline: float, started: float) -> float:
+    """What is left of `deadline` since `started`; the escalation retry shares the caller's budget"""
+    remaining = deadline - (time.monotonic() - started)
+    if remaining <= 0:
+        raise asyncio.TimeoutError(f"Deadline of {deadline}s spent before escalation")
+    return remaining
+
+
+async def _acquire_within(model: str, priority: Priority, tokens: int, deadline: float) -> float:
+    """
+    scheduler.acquire bounded by `deadline`, so time spent queueing counts
+    against the caller's budget. Returns what is left of it; raises
+    asyncio.TimeoutError (the caller's fallback path) if it runs out first.
+    """
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(scheduler.acquire(model, priority, tokens), timeout=deadline)
+    except asyncio.TimeoutError:
+        raise asyncio.TimeoutError(f"Deadline of {deadline}s expired waiting for {model} rate budget") from None
+    remaining = deadline - (time.monotonic() - started)
+    if remaining <= 0:
+        raise asyncio.TimeoutError(f"Deadline of {deadline}s expired waiting for {model} rate budget")
+    return remaining
+
+
+async def _complete(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int,
+                    priority: Priority, deadline: float, **kwargs: Any) -> str:
+    async_client = groq_client.get_async_client()
+    if not async_client:
+        raise LLMUnavailableError("Groq client not available")
+
+    provider_breaker.before_call()
+    estimated_tokens = estimate_prompt_tokens(messages) + max_tokens
+    try:
+        deadline = await _acquire_within(model, priority, estimated_tokens, deadline)
+    except BaseException:
+        provider_breaker.release_probe()
+        raise
+
+    async def attempt():
+        async with _request_slots:
+            return await async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs
+            )
+
+    # A hedge is only sent if it fits in the rate budget without queueing
+    response = await call_with_resilience(
+        attempt, model, deadline=deadline,
+        hedge_allowed=lambda: scheduler.try_acquire(model, estimated_tokens)
+    )
+
+    usage = getattr(response, "usage", None)
+    scheduler.reconcile(model, estimated_tokens, getattr(usage, "total_tokens", None))
+    return response.choices[0].message.content or ""
+
+
+async def chat_json(messages: List[Dict[str, str]], schema: Schema, call_site: Optional[str] = None,
+                    **kwargs: Any) -> dict:
+    """
+    chat_completion in the provider's JSON mode, parsed and validated against
+    `schema`. An invalid payload from a routed small model is retried once on
+    the route's escalation model; both attempts share one `deadline`.
+    Raises StructuredOutputError when the payload is unusable.
+    """
+    route = resolve_route(call_site)
+    model = kwargs.pop("model", None)
+    deadline = kwargs.pop("deadline", LLM_CALL_TIMEOUT)
+    started = time.monotonic()
+    content = await chat_completion(messages, model=model or route.model, deadline=deadline,
+                                    **json_mode_kwargs(), **kwargs)
+    try:
+        return parse_structured(content, schema)
+    except StructuredOutputError as e:
+        if model or not route.escalation_model:
+            raise
+        print(f"⤴️ Escalating {call_site} to {route.escalation_model}: {e}")
+        record_escalation(call_site)
+    content = await chat_completion(messages, model=route.escalation_model, deadline=_remaining(deadline, started),
+                                    **json_mode_kwargs(), **kwargs)
+    return parse_structured(content, schema)
+
+
+async def chat_completion_stream(messages: List[Dict[str, str]],
+                                 model: Optional[str] = None,
+                                 temperature: float = 0.3,
+                                 max_tokens: int = 500,
+                                 priority: Priority = Priority.INTERVIEWER_REPLY,
+                                 deadline: float = LLM_CALL_TIMEOUT,
+                                 call_site: Optional[str] = None,
+                                 **kwargs: Any) -> AsyncIterator[str]:
+    """
+    Stream a chat completion, yielding content deltas as tokens arrive.
+    The request slot is held until the stream is exhausted or closed.
+    `deadline` bounds time to the first byte, queueing included; each later chunk must arrive
+    within LLM_STREAM_IDLE_TIMEOUT. Streams are routed but never escalated.
+    JSON mode is not sent: the provider validates JSON only once the whole
+    body is generated, so callers parse the streamed text themselves
+    (JsonFieldStream while streaming, parse_structured on the full text).
+    """
+    async_client = groq_client.get_async_client()
+    if not async_client:
+        raise LLMUnavailableError("Groq client not available")
+    model = model or resolve_route(call_site).model
+    kwargs.pop("response_format", None)
+
+    provider_breaker.before_call()
+    prompt_tokens = estimate_prompt_tokens(messages)
+    estimated_tokens = prompt_tokens + max_tokens
+    try:
+        # Timing out in our own queue says nothing about the provider
+        deadline = await _acquire_within(model, priority, estimated_tokens, deadline)
+    except BaseException:
+        provider_breaker.release_probe()
+        raise
+    streamed_chars = 0
+    actual_tokens: Optional[int] = None
+    try:
+        async with _request_slots:
+            stream = await asyncio.wait_for(async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **kwargs
+            ), timeout=deadline)
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=LLM_STREAM_IDLE_TIMEOUT)
+                except StopAsyncIteration:
+                    break
+                # Usage comes on the final chunk (Groq sends it under x_groq)
+                usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+                if usage is not None and getattr(usage, "total_tokens", None) is not None:
+                    actual_tokens = usage.total_tokens
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    streamed_chars += len(delta)
+                    yield delta
+    except Exception as e:
+        if is_provider_failure(e):
+            provider_breaker.record_failure()
+        else:
+            provider_breaker.release_probe()
+        raise
+    except BaseException:
+        # Cancelled or closed early by the consumer
+        provider_breaker.release_probe()
+        raise
+    finally:
+        # Without reported usage, charge the prompt plus what was actually streamed
+        scheduler.reconcile(model, estimated_tokens,
+                            actual_tokens if actual_tokens is not None else prompt_tokens + streamed_chars // 4 + 1)
+    provider_breaker.record_success()
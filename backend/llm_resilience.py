@@ -0,0 +1,224 @@
+"""
+Resilience layer for provider calls: per-call deadlines, optional hedged
+requests past the observed p95 latency, and a circuit breaker that lets
+callers go straight to their fallbacks while the provider is degraded.
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Hard deadline for one chat completion (seconds)
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "20"))
+# Deadline for one speech-to-text request (seconds)
+STT_CALL_TIMEOUT = float(os.getenv("STT_CALL_TIMEOUT", "30"))
+# Max gap between streamed chunks before the stream is abandoned (seconds)
+LLM_STREAM_IDLE_TIMEOUT = float(os.getenv("LLM_STREAM_IDLE_TIMEOUT", "10"))
+# Fire a second identical request when the first is slower than the observed p95
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+# Consecutive failures that open the circuit, and how long it stays open (seconds)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("LLM_CIRCUIT_RESET_TIMEOUT", "30"))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the provider while the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; open -> half_open
+    after `reset_timeout`, letting a single probe through; the probe's outcome
+    closes or re-opens the circuit. Safe to share between threads.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """True while callers should skip the provider (no side effects)"""
+        with self._lock:
+            if self.state == "open":
+                return time.monotonic() - self.opened_at < self.reset_timeout
+            return self.state == "half_open" and self._probe_in_flight
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def before_call(self):
+        if not self.allow_request():
+            raise CircuitOpenError("LLM provider circuit is open")
+
+    def release_probe(self):
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                    print(f"⚡ LLM circuit opened after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "times_opened": self.times_opened}
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies per model"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, model: str, seconds: float):
+        self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        samples = self._samples.get(model)
+        if not samples or len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+provider_breaker = CircuitBreaker()
+latencies = LatencyTracker()
+stats = {"calls": 0, "timeouts": 0, "failures": 0, "hedges": 0, "hedge_wins": 0}
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """Client errors (bad request, JSON-mode validation) say nothing about provider health; 429 does"""
+    status = getattr(exc, "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status != 429)
+
+
+async def _cancel(tasks):
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except BaseException:
+            pass
+
+
+async def _hedged(make_call: Callable[[], Awaitable[T]], model: str,
+                  hedge_allowed: Optional[Callable[[], bool]]) -> T:
+    primary = asyncio.ensure_future(make_call())
+    tasks = {primary}
+    try:
+        threshold = latencies.percentile(model, LLM_HEDGE_PERCENTILE) if LLM_HEDGE_ENABLED else None
+        if threshold is None:
+            return await primary
+        done, _ = await asyncio.wait(tasks, timeout=threshold)
+        if done or (hedge_allowed is not None and not hedge_allowed()):
+            return await primary
+        stats["hedges"] += 1
+        hedge = asyncio.ensure_future(make_call())
+        tasks.add(hedge)
+        last_error: Optional[BaseException] = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        stats["hedge_wins"] += 1
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        await _cancel([t for t in tasks if not t.done()])
+
+
+async def call_with_resilience(make_call: Callable[[], Awaitable[T]], model: str,
+                               deadline: float = LLM_CALL_TIMEOUT,
+                               hedge_allowed: Optional[Callable[[], bool]] = None) -> T:
+    """
+    Run make_call() under a deadline, hedging past p95 if enabled. The caller
+    must have passed provider_breaker.before_call(); outcomes are recorded here.
+    """
+    stats["calls"] += 1
+    started = time.monotonic()
+    try:
+        result = await asyncio.wait_for(_hedged(make_call, model, hedge_allowed), timeout=deadline)
+    except asyncio.TimeoutError:
+        stats["timeouts"] += 1
+        provider_breaker.record_failure()
+        raise
+    except Exception as e:
+        stats["failures"] += 1
+        if is_provider_failure(e):
+            provider_breaker.record_failure()
+        else:
+            provider_breaker.release_probe()
+        raise
+    except asyncio.CancelledError:
+        # Caller went away; that says nothing about the provider
+        provider_breaker.release_probe()
+        raise
+    provider_breaker.record_success()
+    latencies.record(model, time.monotonic() - started)
+    return result
+
+
+def call_sync(make_call: Callable[[], T]) -> T:
+    """
+    Blocking counterpart of call_with_resilience for the CLI scripts: goes
+    through the circuit breaker and records the outcome, but does not hedge;
+    make_call() must enforce its own deadline (the client's timeout).
+    """
+    provider_breaker.before_call()
+    stats["calls"] += 1
+    try:
+        result = make_call()
+    except Exception as e:
+        stats["failures"] += 1
+        if is_provider_failure(e):
+            provider_breaker.record_failure()
+        else:
+            provider_breaker.release_probe()
+        raise
+    except BaseException:
+        provider_breaker.release_probe()
+        raise
+    provider_breaker.record_success()
+    return result
+
+
+def metrics() -> dict:
+    return {"circuit": provider_breaker.snapshot(), **stats}
@@ -0,0 +1,187 @@
+"""
+In-process LLM request scheduler.
+
+Each model gets a requests/min and tokens/min token bucket. Waiting calls are
+released strictly by priority class (then arrival order), so the calls that
+decide a candidate's score are never stuck behind hints or approach feedback.
+"""
+import os
+import json
+import time
+import heapq
+import asyncio
+import itertools
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+
+class Priority(IntEnum):
+    """Lower value is served first"""
+    EVALUATION = 0
+    INTERVIEWER_REPLY = 1
+    QUESTION_GENERATION = 2
+    HINT = 3
+    APPROACH_ANALYSIS = 4
+    BACKGROUND = 5  # question pool refill, readiness probes
+
+
+# Defaults applied to every model unless overridden in LLM_RATE_LIMITS
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "1000"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "300000"))
+# Per-model overrides, e.g. '{"llama-3.3-70b-versatile": [30, 6000]}'
+LLM_RATE_LIMITS: Dict[str, List[float]] = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+
+
+def estimate_prompt_tokens(messages: List[Dict[str, str]]) -> int:
+    """~4 characters per token plus a little per-message overhead"""
+    return sum(len(m.get("content") or "") // 4 + 4 for m in messages)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (amounts above capacity only need a full bucket)"""
+        self._refill()
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate) if self.rate > 0 else float("inf")
+
+    def available(self) -> float:
+        self._refill()
+        return self.level
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def give_back(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _ModelQueue:
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        # (priority, sequence, tokens, enqueued_at, future)
+        self.waiters: List[Tuple[int, int, int, float, asyncio.Future]] = []
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.arrival = asyncio.Event()
+
+
+class _PriorityStats:
+    def __init__(self):
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record(self, wait: float):
+        self.granted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.last_wait = wait
+
+
+class LLMScheduler:
+    def __init__(self):
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._stats: Dict[Priority, _PriorityStats] = {p: _PriorityStats() for p in Priority}
+        self._sequence = itertools.count()
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            rpm, tpm = LLM_RATE_LIMITS.get(model, (LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE))
+            queue = self._queues[model] = _ModelQueue(rpm, tpm)
+        return queue
+
+    async def acquire(self, model: str, priority: Priority, tokens: int):
+        """Wait until `model` has budget for one request of ~`tokens` and no higher-priority call is waiting"""
+        queue = self._queue(model)
+        future = asyncio.get_running_loop().create_future()
+        enqueued_at = time.monotonic()
+        heapq.heappush(queue.waiters, (int(priority), next(self._sequence), tokens, enqueued_at, future))
+        queue.arrival.set()
+        if queue.dispatcher is None or queue.dispatcher.done():
+            queue.dispatcher = asyncio.create_task(self._dispatch(queue))
+        # A cancelled waiter leaves its future cancelled; the dispatcher skips it
+        await future
+        self._stats[Priority(priority)].record(time.monotonic() - enqueued_at)
+
+    def try_acquire(self, model: str, tokens: int) -> bool:
+        """Take budget immediately if nobody is queued and it is available (used for optional extra requests)"""
+        queue = self._queue(model)
+        if queue.waiters or queue.requests.wait_time(1) > 0 or queue.tokens.wait_time(tokens) > 0:
+            return False
+        queue.requests.take(1)
+        queue.tokens.take(tokens)
+        return True
+
+    def reconcile(self, model: str, estimated: int, actual: Optional[int]):
+        """Correct the token bucket once the provider reports real usage"""
+        if actual is None:
+            return
+        queue = self._queue(model)
+        if actual < estimated:
+            queue.tokens.give_back(estimated - actual)
+        elif actual > estimated:
+            queue.tokens.take(actual - estimated)
+
+    async def _dispatch(self, queue: _ModelQueue):
+        while queue.waiters:
+            _, _, tokens, _, future = queue.waiters[0]
+            if future.done():
+                heapq.heappop(queue.waiters)
+                continue
+            delay = max(queue.requests.wait_time(1), queue.tokens.wait_time(tokens))
+            if delay > 0:
+                # Wake early on new arrivals so a higher-priority call can take the head
+                queue.arrival.clear()
+                try:
+                    await asyncio.wait_for(queue.arrival.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(queue.waiters)
+            queue.requests.take(1)
+            queue.tokens.take(tokens)
+            future.set_result(None)
+
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        models = {}
+        for model, queue in self._queues.items():
+            pending = [w for w in queue.waiters if not w[4].done()]
+            depth = {p.name.lower(): 0 for p in Priority}
+            for priority, _, _, _, _ in pending:
+                depth[Priority(priority).name.lower()] += 1
+            models[model] = {
+                "queue_depth": len(pending),
+                "queue_depth_by_priority": depth,
+                "oldest_wait_seconds": round(max((now - w[3] for w in pending), default=0.0), 3),
+                "requests_available": round(queue.requests.available(), 1),
+                "tokens_available": round(queue.tokens.available(), 1),
+            }
+        priorities = {
+            p.name.lower(): {
+                "granted": s.granted,
+                "avg_wait_seconds": round(s.total_wait / s.granted, 4) if s.granted else 0.0,
+                "max_wait_seconds": round(s.max_wait, 4),
+                "last_wait_seconds": round(s.last_wait, 4),
+            }
+            for p, s in self._stats.items()
+        }
+        return {"models": models, "priorities": priorities}
+
+
+scheduler = LLMScheduler()
@@ -0,0 +1,168 @@
+"""
+Local stand-in for the Groq chat and transcription endpoints.
+
+Point the server at it with GROQ_BASE_URL=http://127.0.0.1:<port>. Responses
+are canned per call site (question, evaluation, interviewer reply, free text)
+with configurable latency and error injection.
+
+Run standalone:  python -m loadtest.fake_groq --port 9100 --latency-ms 800
+"""
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class FakeGroqConfig:
+    def __init__(self, latency_ms: float = 500, jitter_ms: float = 200, error_rate: float = 0.0,
+                 error_status: int = 500, stt_latency_ms: float = 300, tokens_per_second: float = 250):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stt_latency_ms = stt_latency_ms
+        self.tokens_per_second = tokens_per_second
+
+
+def _question_payload(prompt: str) -> dict:
+    difficulty = "hard" if "Difficulty: hard" in prompt else "easy" if "Difficulty: easy" in prompt else "medium"
+    return {
+        "question": f"Given an array of n integers, return the length of the longest strictly increasing subsequence. ({difficulty}, {uuid.uuid4().hex[:6]})",
+        "difficulty": difficulty,
+        "topics": ["DSA"],
+        "hints": ["Think about dynamic programming", "Can binary search help?", "Track the smallest tail per length"],
+        "test_cases": [{"input": "[10,9,2,5,3,7,101,18]", "output": "4", "explanation": "2,3,7,101"}],
+        "evaluation_criteria": ["Problem understanding and approach discussion", "Code correctness and implementation quality"],
+    }
+
+
+def _evaluation_payload() -> dict:
+    return {
+        "score": random.randint(55, 95),
+        "feedback": "Solid solution with a clear structure.",
+        "correctness": "Handles the sample cases.",
+        "approach_quality": "Reasonable approach.",
+        "code_quality": "Readable.",
+        "areas_for_improvement": ["Discuss complexity", "Cover empty input"],
+    }
+
+
+def _reply_payload() -> dict:
+    return {
+        "evaluation": "Good explanation. You covered the main trade-offs clearly and concisely.",
+        "next_question": "How would you design a rate limiter for a public API? Walk me through the data structures.",
+        "hint": "",
+        "final_feedback": "",
+    }
+
+
+def canned_completion(messages: list) -> str:
+    """Pick a response shape from the prompt so every call site gets a parseable answer"""
+    text = "\n".join(m.get("content") or "" for m in messages)
+    if "Generate a coding interview question" in text:
+        return json.dumps(_question_payload(text))
+    if "Evaluate this code submission" in text:
+        return json.dumps(_evaluation_payload())
+    if "Conversation so far" in text:
+        return json.dumps(_reply_payload())
+    return "Good start. Consider the time complexity and what happens on empty input."
+
+
+def create_app(config: FakeGroqConfig) -> FastAPI:
+    app = FastAPI(title="Fake Groq")
+    app.state.config = config
+    app.state.counters = {"chat": 0, "stream": 0, "transcriptions": 0, "errors": 0}
+
+    async def _delay(base_ms: float):
+        await asyncio.sleep(max(0.0, random.gauss(base_ms, config.jitter_ms)) / 1000)
+
+    def _maybe_error():
+        if config.error_rate and random.random() < config.error_rate:
+            app.state.counters["errors"] += 1
+            return JSONResponse(status_code=config.error_status,
+                                content={"error": {"message": "injected failure", "type": "server_error"}})
+        return None
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await _delay(config.latency_ms)
+        error = _maybe_error()
+        if error:
+            return error
+        content = canned_completion(body.get("messages", []))
+        model = body.get("model", "fake")
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if body.get("stream"):
+            app.state.counters["stream"] += 1
+
+            async def events():
+                pieces = [content[i:i + 12] for i in range(0, len(content), 12)]
+                for piece in pieces:
+                    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                             "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(3 / config.tokens_per_second)
+                done = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                yield f"data: {json.dumps(done)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        app.state.counters["chat"] += 1
+        # Non-streamed completions pay for generation time up front
+        await asyncio.sleep(len(content) / 4 / config.tokens_per_second)
+        prompt_tokens = sum(len(m.get("content") or "") for m in body.get("messages", [])) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    @app.post("/openai/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        await request.body()
+        await _delay(config.stt_latency_ms)
+        error = _maybe_error()
+        if error:
+            return error
+        app.state.counters["transcriptions"] += 1
+        return {"text": "I would use a hash map to count frequencies and then scan once more for the answer."}
+
+    @app.get("/openai/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "llama-3.3-70b-versatile", "object": "model"},
+                                           {"id": "whisper-large-v3-turbo", "object": "model"}]}
+
+    @app.get("/counters")
+    async def counters():
+        return app.state.counters
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Groq server for load tests")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    args = parser.parse_args()
+    config = FakeGroqConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+    uvicorn.run(create_app(config), host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,92 @@
+"""
+In-memory stand-in for the supabase-py client, covering the query-builder
+calls database.InterviewDatabase makes. Like the real client, execute() is
+synchronous and can be given a simulated round-trip latency.
+"""
+import time
+import threading
+import itertools
+from typing import Any, Dict, List
+
+
+class FakeResult:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, store: "FakeSupabase", table: str):
+        self._store = store
+        self._table = table
+        self._action = "select"
+        self._payload: Any = None
+        self._filters: List[tuple] = []
+        self._order: tuple = None
+        self._limit: int = None
+
+    def select(self, *_columns):
+        self._action = "select"
+        return self
+
+    def insert(self, payload):
+        self._action = "insert"
+        self._payload = payload
+        return self
+
+    def update(self, payload):
+        self._action = "update"
+        self._payload = payload
+        return self
+
+    def eq(self, column, value):
+        self._filters.append((column, value))
+        return self
+
+    def order(self, column, desc: bool = False):
+        self._order = (column, desc)
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def _matches(self, row):
+        return all(row.get(column) == value for column, value in self._filters)
+
+    def execute(self) -> FakeResult:
+        if self._store.latency_ms:
+            time.sleep(self._store.latency_ms / 1000)
+        with self._store.lock:
+            self._store.calls[self._action] = self._store.calls.get(self._action, 0) + 1
+            rows = self._store.tables.setdefault(self._table, [])
+            if self._action == "insert":
+                new_rows = self._payload if isinstance(self._payload, list) else [self._payload]
+                inserted = []
+                for row in new_rows:
+                    row = dict(row, id=next(self._store.ids))
+                    rows.append(row)
+                    inserted.append(dict(row))
+                return FakeResult(inserted)
+            matched = [row for row in rows if self._matches(row)]
+            if self._action == "update":
+                for row in matched:
+                    row.update(self._payload)
+                return FakeResult([dict(row) for row in matched])
+            if self._order:
+                column, desc = self._order
+                matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+            if self._limit is not None:
+                matched = matched[:self._limit]
+            return FakeResult([dict(row) for row in matched])
+
+
+class FakeSupabase:
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.calls: Dict[str, int] = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
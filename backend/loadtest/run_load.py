@@ -0,0 +1,279 @@
+"""
+Load-test driver: runs N scripted candidates through /ws and /ws/technical
+against the real ws_server app, backed by the fake Groq server and an
+in-memory Supabase, and reports throughput, per-message latency
+percentiles and server event-loop lag.
+
+Usage (from backend/):
+    python -m loadtest.run_load --sessions 200 --mix 0.5 --latency-ms 800
+    python -m loadtest.run_load --sessions 100 --error-rate 0.05 --stream --json results.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import uvicorn
+import websockets
+
+from loadtest.fake_groq import FakeGroqConfig, create_app as create_fake_groq
+from loadtest.fake_supabase import FakeSupabase
+
+SAMPLE_CODE = """def longest_increasing_subsequence(nums):
+    import bisect
+    tails = []
+    for n in nums:
+        i = bisect.bisect_left(tails, n)
+        if i == len(tails):
+            tails.append(n)
+        else:
+            tails[i] = n
+    return len(tails)
+"""
+
+SAMPLE_ANSWERS = [
+    "I am a backend engineer with three years of experience building APIs in Python and Go.",
+    "A hash map gives constant time lookups on average, but collisions can degrade it to linear time.",
+    "I would shard the data by user id and put a cache in front of the hottest reads.",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic sleep wakes up on the monitored loop"""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.samples: List[float] = []
+        self.running = True
+
+    async def run(self):
+        while self.running:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.messages = 0
+        self.sessions_done = 0
+        self.sessions_failed = 0
+
+    def record(self, label: str, seconds: float):
+        self.latencies[label].append(seconds)
+        self.messages += 1
+
+
+async def await_reply(ws, expect: set, recorder: Recorder, sent: float, timeout: float, request_type: str) -> dict:
+    """Wait for a reply of an expected type, timing it (and the first streamed delta) from `sent`"""
+    first_delta = True
+    while True:
+        msg = json.loads(await asyncio.wait_for(ws.recv(), timeout=timeout))
+        mtype = msg.get("type")
+        elapsed = time.perf_counter() - sent
+        if mtype == "assessment_delta":
+            if first_delta:
+                recorder.record("assessment_first_delta", elapsed)
+                first_delta = False
+            continue
+        if mtype == "error":
+            recorder.errors[request_type] += 1
+            return msg
+        if mtype in expect:
+            recorder.record(mtype, elapsed)
+            return msg
+
+
+async def exchange(ws, payload: dict, expect: set, recorder: Recorder, timeout: float) -> dict:
+    """Send one message and wait for a reply of an expected type"""
+    sent = time.perf_counter()
+    await ws.send(json.dumps(payload))
+    return await await_reply(ws, expect, recorder, sent, timeout, payload["type"])
+
+
+async def technical_candidate(url: str, recorder: Recorder, args):
+    async with websockets.connect(url + "/ws/technical", max_size=None) as ws:
+        topics = random.sample(["DSA", "DBMS", "System Design", "OOPS"], k=random.randint(1, 2))
+        await exchange(ws, {"type": "init_technical", "topics": topics}, {"question"}, recorder, args.timeout)
+        for _ in range(8):
+            await asyncio.sleep(args.think_ms / 1000)
+            await exchange(ws, {"type": "voice_approach", "transcript": SAMPLE_ANSWERS[1]},
+                           {"approach_feedback"}, recorder, args.timeout)
+            await exchange(ws, {"type": "request_hint", "code": SAMPLE_CODE[:60], "language": "python"},
+                           {"hint"}, recorder, args.timeout)
+            sent = time.perf_counter()
+            await ws.send(json.dumps({"type": "submit_code", "code": SAMPLE_CODE, "language": "python",
+                                      "time_spent": random.randint(60000, 900000), "hints_used": 1}))
+            await await_reply(ws, {"code_feedback"}, recorder, sent, args.timeout, "submit_code")
+            reply = await await_reply(ws, {"question_complete", "interview_complete"}, recorder, sent,
+                                      args.timeout, "submit_code")
+            if reply.get("type") != "question_complete":
+                break
+
+
+async def conversational_candidate(url: str, recorder: Recorder, args):
+    async with websockets.connect(url + "/ws", max_size=None) as ws:
+        await exchange(ws, {"type": "init", "mode": "topics", "topics": ["DSA", "System Design"], "stream": args.stream},
+                       {"ready"}, recorder, args.timeout)
+        for answer in SAMPLE_ANSWERS:
+            await asyncio.sleep(args.think_ms / 1000)
+            await exchange(ws, {"type": "answer", "text": answer}, {"assessment"}, recorder, args.timeout)
+        await exchange(ws, {"type": "code_submission", "code": SAMPLE_CODE}, {"assessment"}, recorder, args.timeout)
+        await exchange(ws, {"type": "end"}, {"ended"}, recorder, args.timeout)
+
+
+async def run_candidates(url: str, args) -> Recorder:
+    recorder = Recorder()
+
+    async def one(index: int):
+        await asyncio.sleep(args.ramp_seconds * index / max(1, args.sessions))
+        candidate = technical_candidate if random.random() < args.mix else conversational_candidate
+        try:
+            await candidate(url, recorder, args)
+            recorder.sessions_done += 1
+        except Exception as e:
+            recorder.sessions_failed += 1
+            print(f"❌ Session {index} failed: {type(e).__name__}: {e}")
+
+    await asyncio.gather(*(one(i) for i in range(args.sessions)))
+    return recorder
+
+
+def start_server_thread(app, port: int, monitor: Optional[LoopLagMonitor] = None) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+
+    async def serve():
+        if monitor:
+            asyncio.get_running_loop().create_task(monitor.run())
+        await server.serve()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def report(recorder: Recorder, elapsed: float, lag: LoopLagMonitor, extra: dict) -> dict:
+    rows = {
+        label: {
+            "count": len(samples),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+        }
+        for label, samples in sorted(recorder.latencies.items())
+    }
+    summary = {
+        "elapsed_seconds": round(elapsed, 2),
+        "sessions_completed": recorder.sessions_done,
+        "sessions_failed": recorder.sessions_failed,
+        "sessions_per_second": round(recorder.sessions_done / elapsed, 2) if elapsed else 0,
+        "messages_per_second": round(recorder.messages / elapsed, 2) if elapsed else 0,
+        "error_replies": dict(recorder.errors),
+        "latency": rows,
+        "event_loop_lag_ms": {
+            "p50": round(percentile(lag.samples, 0.50) * 1000, 2),
+            "p99": round(percentile(lag.samples, 0.99) * 1000, 2),
+            "max": round(max(lag.samples, default=0.0) * 1000, 2),
+        },
+        **extra,
+    }
+
+    print("\n📊 Load test results")
+    print(f"   Sessions: {recorder.sessions_done} ok / {recorder.sessions_failed} failed in {elapsed:.1f}s "
+          f"({summary['sessions_per_second']} sessions/s, {summary['messages_per_second']} msgs/s)")
+    print(f"   {'message':<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label, row in rows.items():
+        print(f"   {label:<24}{row['count']:>7}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+    lag_ms = summary["event_loop_lag_ms"]
+    print(f"   Event-loop lag: p50 {lag_ms['p50']} ms, p99 {lag_ms['p99']} ms, max {lag_ms['max']} ms")
+    if recorder.errors:
+        print(f"   Error replies: {dict(recorder.errors)}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent interview-session load test")
+    parser.add_argument("--sessions", type=int, default=100, help="scripted candidates to run")
+    parser.add_argument("--mix", type=float, default=0.5, help="fraction of technical (/ws/technical) sessions")
+    parser.add_argument("--ramp-seconds", type=float, default=5.0, help="spread session starts over this window")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pause before each candidate turn")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-reply timeout (seconds)")
+    parser.add_argument("--stream", action="store_true", help="request streamed interviewer replies on /ws")
+    parser.add_argument("--latency-ms", type=float, default=500, help="fake Groq mean latency")
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake Groq calls that fail")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--db-latency-ms", type=float, default=50, help="simulated Supabase round-trip")
+    parser.add_argument("--groq-url", help="use an already running fake Groq instead of starting one")
+    parser.add_argument("--json", help="write the summary to this file")
+    args = parser.parse_args()
+
+    fake_groq = None
+    if args.groq_url:
+        groq_url = args.groq_url
+    else:
+        config = FakeGroqConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+        fake_groq = create_fake_groq(config)
+        groq_port = free_port()
+        start_server_thread(fake_groq, groq_port)
+        groq_url = f"http://127.0.0.1:{groq_port}"
+
+    # The server must see the fake provider before its modules are imported
+    os.environ["GROQ_API_KEY"] = "fake-load-test-key"
+    os.environ["GROQ_BASE_URL"] = groq_url
+    os.environ.setdefault("QUESTION_POOL_PREWARM", "none")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    import database
+    fake_db = FakeSupabase(latency_ms=args.db_latency_ms)
+    database.db.supabase = fake_db
+    import ws_server
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    # Result files are written relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="codesage-load-"))
+
+    monitor = LoopLagMonitor()
+    server_port = free_port()
+    start_server_thread(ws_server.app, server_port, monitor)
+
+    started = time.perf_counter()
+    recorder = asyncio.run(run_candidates(f"ws://127.0.0.1:{server_port}", args))
+    elapsed = time.perf_counter() - started
+    monitor.running = False
+
+    extra = {"supabase_calls": dict(fake_db.calls)}
+    if fake_groq is not None:
+        extra["fake_groq_calls"] = dict(fake_groq.state.counters)
+    summary = report(recorder, elapsed, monitor, extra)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
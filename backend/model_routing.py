@@ -0,0 +1,57 @@
+"""
+Model routing: maps each LLM call site to a model tier, with an optional
+escalation tier used when the cheaper model's output fails validation.
+"""
+import os
+import json
+from collections import defaultdict
+from typing import Dict, Optional
+
+MODEL_TIERS: Dict[str, str] = {
+    "large": os.getenv("LLM_MODEL_LARGE", "llama-3.3-70b-versatile"),
+    "small": os.getenv("LLM_MODEL_SMALL", "llama-3.1-8b-instant"),
+}
+
+# call site -> {"tier": ..., "escalate_to": ...}
+DEFAULT_ROUTES: Dict[str, Dict[str, str]] = {
+    "question_generation": {"tier": "large"},
+    "code_evaluation": {"tier": "large"},
+    "interviewer_reply": {"tier": "large"},
+    "hint": {"tier": "small", "escalate_to": "large"},
+    "approach_analysis": {"tier": "small", "escalate_to": "large"},
+}
+
+# Overrides, e.g. LLM_MODEL_ROUTES='{"hint": {"tier": "large"}}'
+ROUTES: Dict[str, Dict[str, str]] = {**DEFAULT_ROUTES, **json.loads(os.getenv("LLM_MODEL_ROUTES", "{}"))}
+
+escalations: Dict[str, int] = defaultdict(int)
+
+
+class Route:
+    def __init__(self, call_site: Optional[str], model: str, escalation_model: Optional[str] = None):
+        self.call_site = call_site
+        self.model = model
+        self.escalation_model = escalation_model if escalation_model != model else None
+
+
+def _model_for(tier: Optional[str]) -> Optional[str]:
+    if tier is None:
+        return None
+    # Unknown tier names are taken as literal model ids
+    return MODEL_TIERS.get(tier, tier)
+
+
+def resolve_route(call_site: Optional[str]) -> Route:
+    config = ROUTES.get(call_site or "", {"tier": "large"})
+    return Route(call_site, _model_for(config.get("tier", "large")), _model_for(config.get("escalate_to")))
+
+
+def record_escalation(call_site: Optional[str]):
+    escalations[call_site or "unrouted"] += 1
+
+
+def metrics() -> dict:
+    return {
+        "routes": {site: resolve_route(site).model for site in ROUTES},
+        "escalations": dict(escalations),
+    }
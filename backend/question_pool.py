@@ -0,0 +1,142 @@
+"""
+Pre-generated technical question pool.
+
+Questions are keyed by the canonical (sorted topic set, difficulty) pair and a
+background task keeps every tracked key topped up to QUESTION_POOL_DEPTH, so a
+new session usually starts with a dictionary pop instead of LLM round-trips.
+"""
+import os
+import asyncio
+from collections import deque
+from itertools import combinations
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from utils import TOPIC_OPTIONS
+
+# Questions kept ready per (topic set, difficulty)
+QUESTION_POOL_DEPTH = int(os.getenv("QUESTION_POOL_DEPTH", "2"))
+# Parallel LLM generations the refill task may run
+QUESTION_POOL_REFILL_CONCURRENCY = int(os.getenv("QUESTION_POOL_REFILL_CONCURRENCY", "2"))
+# Topic sets warmed at startup: "none", "single" (each topic on its own) or "all" (every combination).
+# Off by default: warming spends LLM tokens on keys no session may ever ask for; keys
+# are tracked (and then kept topped up) the first time a session uses them.
+QUESTION_POOL_PREWARM = os.getenv("QUESTION_POOL_PREWARM", "none")
+# Seconds to wait before retrying after a failed generation
+QUESTION_POOL_RETRY_DELAY = float(os.getenv("QUESTION_POOL_RETRY_DELAY", "30"))
+
+PoolKey = Tuple[Tuple[str, ...], str]
+QuestionGenerator = Callable[[List[str], str], Awaitable[dict]]
+
+
+def pool_key(topics: Iterable[str], difficulty: str) -> PoolKey:
+    """Canonical key: order and duplicates in the topic list don't matter"""
+    return tuple(sorted(set(topics))), difficulty
+
+
+class QuestionPool:
+    """In-memory question pool with background refill"""
+
+    def __init__(self, generator: QuestionGenerator,
+                 depth: int = QUESTION_POOL_DEPTH,
+                 refill_concurrency: int = QUESTION_POOL_REFILL_CONCURRENCY):
+        self._generator = generator
+        self.depth = depth
+        self.refill_concurrency = refill_concurrency
+        self._pools: Dict[PoolKey, Deque[dict]] = {}
+        self._in_flight: Dict[PoolKey, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._refill_task: Optional[asyncio.Task] = None
+        self._fill_slots: Optional[asyncio.Semaphore] = None
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def track(self, topics: Iterable[str], difficulty: str) -> bool:
+        """Start keeping a key topped up. Only known topics are pooled so clients can't grow the pool"""
+        key = pool_key(topics, difficulty)
+        if not key[0] or not set(key[0]).issubset(TOPIC_OPTIONS):
+            return False
+        if key not in self._pools:
+            self._pools[key] = deque()
+            self._in_flight[key] = 0
+            self._wake()
+        return True
+
+    def prewarm(self, difficulties: Iterable[str], mode: str = QUESTION_POOL_PREWARM):
+        if mode == "none":
+            return
+        sizes = range(1, len(TOPIC_OPTIONS) + 1) if mode == "all" else [1]
+        for size in sizes:
+            for topics in combinations(TOPIC_OPTIONS, size):
+                for difficulty in set(difficulties):
+                    self.track(topics, difficulty)
+        print(f"🔥 Question pool prewarming {len(self._pools)} keys (depth {self.depth})")
+
+    def take(self, topics: Iterable[str], difficulty: str) -> Optional[dict]:
+        """O(1) pop of a ready question, or None when the caller must generate live"""
+        if not self.track(topics, difficulty):
+            return None
+        bucket = self._pools[pool_key(topics, difficulty)]
+        if not bucket:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._wake()
+        return bucket.popleft()
+
+    def start(self):
+        if self._refill_task is None or self._refill_task.done():
+            self._wakeup = asyncio.Event()
+            self._fill_slots = asyncio.Semaphore(self.refill_concurrency)
+            self._refill_task = asyncio.create_task(self._refill_loop())
+            self._wakeup.set()
+
+    async def stop(self):
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "keys": len(self._pools),
+            "ready": sum(len(bucket) for bucket in self._pools.values()),
+            "in_flight": sum(self._in_flight.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _refill_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            for key, bucket in list(self._pools.items()):
+                missing = self.depth - len(bucket) - self._in_flight[key]
+                for _ in range(max(0, missing)):
+                    self._in_flight[key] += 1
+                    asyncio.create_task(self._fill(key))
+
+    async def _fill(self, key: PoolKey):
+        topics, difficulty = key
+        try:
+            async with self._fill_slots:
+                question = await self._generator(list(topics), difficulty)
+            self._pools[key].append(question)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ Question pool refill failed for {key}: {e}")
+            # Back off instead of hammering a failing provider; the next wakeup retries
+            asyncio.get_running_loop().call_later(QUESTION_POOL_RETRY_DELAY, self._wake)
+        finally:
+            self._in_flight[key] -= 1
@@ -0,0 +1,131 @@
+"""
+Partial transcription of an utterance while the candidate is still talking.
+
+Once speech has started, every STT_PARTIAL_WINDOW_SECONDS of new audio is
+sent to speech-to-text together with STT_PARTIAL_OVERLAP_SECONDS of the
+previous window, one request at a time. Window transcripts are stitched on
+their overlapping words and pushed to the client as they arrive. When the
+utterance ends only the untranscribed tail (plus the overlap) is sent, so the
+final transcript is ready shortly after the last word instead of after a
+full-length STT request.
+"""
+import os
+import re
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+STT_PARTIAL_TRANSCRIPTS = os.getenv("STT_PARTIAL_TRANSCRIPTS", "true").lower() in ("1", "true", "yes")
+STT_PARTIAL_WINDOW_SECONDS = float(os.getenv("STT_PARTIAL_WINDOW_SECONDS", "6"))
+STT_PARTIAL_OVERLAP_SECONDS = float(os.getenv("STT_PARTIAL_OVERLAP_SECONDS", "1"))
+# Longest run of words compared when aligning two windows
+_MAX_STITCH_WORDS = 12
+
+_WORD = re.compile(r"[\w']+")
+
+
+def _norm(word: str) -> str:
+    return "".join(_WORD.findall(word.lower()))
+
+
+def stitch(previous: str, new: str) -> str:
+    """
+    Append `new` to `previous`, dropping the words both windows transcribed
+    from the shared overlap. The last word of `previous` may have been cut
+    mid-word at the window boundary, so it is allowed to be replaced.
+    """
+    if not previous:
+        return new.strip()
+    if not new.strip():
+        return previous
+    old_words, new_words = previous.split(), new.split()
+    old_norm = [_norm(w) for w in old_words]
+    new_norm = [_norm(w) for w in new_words]
+    for k in range(min(_MAX_STITCH_WORDS, len(old_words), len(new_words)), 0, -1):
+        if old_norm[-k:] == new_norm[:k]:
+            return " ".join(old_words + new_words[k:])
+        # Same overlap, but the previous window ended in a truncated word
+        if len(old_words) > k and old_norm[-k - 1:-1] == new_norm[:k]:
+            return " ".join(old_words[:-1] + new_words[k:])
+    return " ".join(old_words + new_words)
+
+
+class PartialTranscriber:
+    """
+    Drives windowed STT for one utterance at a time. `transcribe_pcm` is an
+    async PCM -> text call that runs the request off the event loop (e.g.
+    audio_workers.transcribe_pcm); `on_partial` is awaited with the stitched
+    text after every window.
+    """
+
+    def __init__(self, transcribe_pcm: Callable[[bytes], Awaitable[str]],
+                 on_partial: Optional[Callable[[str], Awaitable[None]]] = None,
+                 sample_rate: int = 16000,
+                 window_seconds: float = STT_PARTIAL_WINDOW_SECONDS,
+                 overlap_seconds: float = STT_PARTIAL_OVERLAP_SECONDS):
+        self._transcribe_pcm = transcribe_pcm
+        self._on_partial = on_partial
+        self.window = int(window_seconds * sample_rate)
+        self.overlap = int(overlap_seconds * sample_rate)
+        self._task: Optional[asyncio.Task] = None
+        self.enabled = STT_PARTIAL_TRANSCRIPTS
+        self.reset()
+
+    def reset(self):
+        self.cancel()
+        self.text = ""
+        self._committed = 0   # samples covered by self.text
+        self.windows = 0
+
+    def cancel(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def update(self, pcm: Callable[[int, Optional[int]], bytes], buffered_samples: int):
+        """
+        Called after each chunk with the utterance so far (`pcm(offset,
+        length)` reads from its start). Starts the next window if enough new
+        audio is buffered and no window is in flight.
+        """
+        if self._task and not self._task.done():
+            return
+        if buffered_samples - self._committed < self.window:
+            return
+        offset = max(0, self._committed - self.overlap)
+        end = self._committed + self.window
+        self._task = asyncio.create_task(self._run_window(pcm(offset, end - offset), end))
+
+    async def _run_window(self, window_pcm: bytes, end: int):
+        try:
+            text = await self._transcribe_pcm(window_pcm)
+        except Exception as e:
+            # The tail request at finalize covers this audio instead
+            print(f"⚠️ Partial transcription failed: {e}")
+            return
+        self.text = stitch(self.text, text)
+        self._committed = end
+        self.windows += 1
+        if self._on_partial and self.text:
+            try:
+                await self._on_partial(self.text)
+            except Exception as e:
+                print(f"⚠️ Could not send partial transcript: {e}")
+
+    async def finalize(self, utterance_pcm: bytes) -> str:
+        """Wait for the window in flight, transcribe only the tail and return the full transcript"""
+        if self._task:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if not self._committed:
+            text = await self._transcribe_pcm(utterance_pcm)
+            self.text = text.strip()
+            return self.text
+        offset = max(0, self._committed - self.overlap) * 2
+        if len(utterance_pcm) > self._committed * 2:
+            tail = await self._transcribe_pcm(utterance_pcm[offset:])
+            self.text = stitch(self.text, tail)
+        self._committed = len(utterance_pcm) // 2
+        return self.text
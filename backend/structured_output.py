@@ -0,0 +1,116 @@
+"""
+Structured (JSON) LLM output: one tolerant parser with precompiled patterns
+and lightweight schema validation for the payloads the interview flow uses.
+"""
+import os
+import re
+import json
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# Ask the provider for JSON mode (response_format=json_object) where supported
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() in ("1", "true", "yes")
+
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_decoder = json.JSONDecoder()
+
+
+class StructuredOutputError(ValueError):
+    """LLM output could not be parsed or does not match the expected schema"""
+
+
+class Schema:
+    """
+    Minimal schema: required/optional fields with expected types, optional
+    numeric bounds, and groups where at least one field must be non-empty.
+    Wrongly typed optional fields are dropped rather than failing the payload.
+    """
+
+    def __init__(self, name: str, required: Dict[str, Any] = None, optional: Dict[str, Any] = None,
+                 bounds: Dict[str, Tuple[float, float]] = None, any_of: Iterable[str] = ()):
+        self.name = name
+        self.required = required or {}
+        self.optional = optional or {}
+        self.bounds = bounds or {}
+        self.any_of = tuple(any_of)
+
+    def validate(self, data: Any) -> dict:
+        if not isinstance(data, dict):
+            raise StructuredOutputError(f"{self.name}: expected a JSON object, got {type(data).__name__}")
+        for field, expected in self.required.items():
+            if field not in data:
+                raise StructuredOutputError(f"{self.name}: missing required field '{field}'")
+            if not _is_type(data[field], expected):
+                raise StructuredOutputError(f"{self.name}: field '{field}' has type {type(data[field]).__name__}")
+        for field, expected in self.optional.items():
+            if field in data and data[field] is not None and not _is_type(data[field], expected):
+                data.pop(field)
+        for field, (low, high) in self.bounds.items():
+            if field in data and not low <= data[field] <= high:
+                raise StructuredOutputError(f"{self.name}: field '{field}'={data[field]} outside [{low}, {high}]")
+        if self.any_of and not any(data.get(field) for field in self.any_of):
+            raise StructuredOutputError(f"{self.name}: expected one of {', '.join(self.any_of)}")
+        return data
+
+
+def _is_type(value: Any, expected) -> bool:
+    # bool is an int subclass but never a valid score/count
+    if isinstance(value, bool) and expected is not bool:
+        return False
+    return isinstance(value, expected)
+
+
+QUESTION_SCHEMA = Schema(
+    "question",
+    required={"question": str},
+    optional={"difficulty": str, "topics": list, "hints": list, "test_cases": list, "evaluation_criteria": list},
+)
+
+EVALUATION_SCHEMA = Schema(
+    "evaluation",
+    required={"score": (int, float)},
+    optional={"feedback": str, "correctness": str, "approach_quality": str, "code_quality": str,
+              "areas_for_improvement": list},
+    bounds={"score": (0, 100)},
+)
+
+INTERVIEWER_REPLY_SCHEMA = Schema(
+    "interviewer_reply",
+    optional={"evaluation": str, "next_question": str, "hint": str, "final_feedback": str},
+    any_of=("evaluation", "next_question", "final_feedback"),
+)
+
+
+def parse_json_object(text: Optional[str]) -> dict:
+    """
+    Decode the first JSON object in `text`. Markdown fences and surrounding
+    chatter are skipped by starting at the first "{"; the text is only
+    rewritten (smart quotes, trailing commas) if that single decode fails.
+    """
+    if not text:
+        raise StructuredOutputError("empty LLM response")
+    start = text.find("{")
+    if start < 0:
+        raise StructuredOutputError("no JSON object in LLM response")
+    try:
+        return _decoder.raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        pass
+    repaired = _TRAILING_COMMA.sub(r"\1", text[start:].translate(_SMART_QUOTES))
+    try:
+        return _decoder.raw_decode(repaired)[0]
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"invalid JSON in LLM response: {e}") from e
+
+
+def parse_structured(text: Optional[str], schema: Schema) -> dict:
+    return schema.validate(parse_json_object(text))
+
+
+def short_text_validator(max_chars: int) -> Callable[[str], bool]:
+    """Accepts a non-empty free-text reply no longer than `max_chars`"""
+    return lambda text: bool(text and text.strip()) and len(text.strip()) <= max_chars
+
+
+def json_mode_kwargs() -> dict:
+    return {"response_format": {"type": "json_object"}} if LLM_JSON_MODE else {}
@@ -0,0 +1,176 @@
+"""
+Speech-to-text backends.
+
+STT_BACKEND selects the engine used by transcribe() / transcribe_pcm():
+
+- "groq"  (default): Groq Whisper (whisper-large-v3-turbo) over the network.
+- "local": faster-whisper on the CPU with int8 weights
+           (pip install faster-whisper). Models stay loaded in a pool of
+           STT_LOCAL_WORKERS processes and each utterance goes to the next
+           free worker on its own, so a burst spreads across all workers
+           and no caller waits for anyone else's audio. Latency does not
+           depend on the upstream, and it works air-gapped.
+
+Both backends are blocking; async callers run them in a worker thread.
+"""
+import io
+import os
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+STT_BACKEND = os.getenv("STT_BACKEND", "groq").lower()
+GROQ_STT_MODEL = os.getenv("GROQ_STT_MODEL", "whisper-large-v3-turbo")
+
+STT_LOCAL_MODEL = os.getenv("STT_LOCAL_MODEL", "small.en")
+STT_LOCAL_COMPUTE_TYPE = os.getenv("STT_LOCAL_COMPUTE_TYPE", "int8")
+STT_LOCAL_WORKERS = int(os.getenv("STT_LOCAL_WORKERS", "2"))
+# Threads each worker's CTranslate2 model may use
+STT_LOCAL_CPU_THREADS = int(os.getenv("STT_LOCAL_CPU_THREADS", "4"))
+STT_LOCAL_LANGUAGE = os.getenv("STT_LOCAL_LANGUAGE", "en")
+STT_LOCAL_TIMEOUT = float(os.getenv("STT_LOCAL_TIMEOUT", "60"))
+
+# (kind, payload): ("pcm", 16 kHz int16 bytes) or ("file", encoded audio bytes)
+AudioItem = Tuple[str, bytes]
+
+
+class STTBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    def transcribe(self, audio: bytes, filename: str = "answer.wav") -> str:
+        """Transcribe an encoded audio file held in memory"""
+
+    @abstractmethod
+    def transcribe_pcm(self, pcm: bytes, sample_rate: int = 16000) -> str:
+        """Transcribe raw 16-bit mono PCM"""
+
+    def warm(self):
+        """Load models ahead of the first request (no-op for remote engines)"""
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class GroqSTT(STTBackend):
+    name = "groq"
+
+    def transcribe(self, audio: bytes, filename: str = "answer.wav") -> str:
+        from groq_client import get_client
+        from llm_resilience import STT_CALL_TIMEOUT
+        client = get_client()
+        if client is None:
+            raise RuntimeError("Groq client not available")
+        result = client.audio.transcriptions.create(
+            file=(filename, audio),
+            model=GROQ_STT_MODEL,
+            timeout=STT_CALL_TIMEOUT
+        )
+        return getattr(result, "text", "").strip()
+
+    def transcribe_pcm(self, pcm: bytes, sample_rate: int = 16000) -> str:
+        from audio_codec import encode_for_stt
+        return self.transcribe(*encode_for_stt(pcm, sample_rate))
+
+
+# --- local engine: runs inside the worker processes -------------------------
+_model = None
+
+
+def _init_worker(model_name: str, compute_type: str, cpu_threads: int):
+    global _model
+    from faster_whisper import WhisperModel
+    _model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _ping() -> bool:
+    return _model is not None
+
+
+def _transcribe_item(item: AudioItem, language: str) -> str:
+    kind, payload = item
+    if kind == "pcm":
+        audio = np.frombuffer(payload, dtype=np.int16).astype(np.float32) / 32768.0
+    else:
+        audio = io.BytesIO(payload)
+    segments, _ = _model.transcribe(audio, language=language, beam_size=1, condition_on_previous_text=False)
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+class LocalWhisperSTT(STTBackend):
+    name = "local"
+
+    def __init__(self, model_name: str = STT_LOCAL_MODEL, compute_type: str = STT_LOCAL_COMPUTE_TYPE,
+                 workers: int = STT_LOCAL_WORKERS):
+        try:
+            import faster_whisper  # noqa: F401 (fail here, not in a worker)
+        except ImportError as e:
+            raise RuntimeError("faster-whisper not installed. Run: pip install faster-whisper") from e
+        self.model_name = model_name
+        self.workers = workers
+        # spawn, not fork: the server process already runs threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, compute_type, STT_LOCAL_CPU_THREADS),
+        )
+        self._counters: Dict[str, int] = {"requests": 0, "in_flight": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Start every worker and load its model"""
+        for job in [self._executor.submit(_ping) for _ in range(self.workers)]:
+            job.result()
+        print(f"✅ Local STT ready: {self.model_name} x{self.workers}")
+
+    def _submit(self, item: AudioItem) -> str:
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["in_flight"] += 1
+        try:
+            return self._executor.submit(_transcribe_item, item, STT_LOCAL_LANGUAGE).result(timeout=STT_LOCAL_TIMEOUT)
+        except Exception:
+            with self._lock:
+                self._counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._counters["in_flight"] -= 1
+
+    def transcribe(self, audio: bytes, filename: str = "answer.wav") -> str:
+        return self._submit(("file", audio))
+
+    def transcribe_pcm(self, pcm: bytes, sample_rate: int = 16000) -> str:
+        if sample_rate != 16000:
+            raise ValueError("Local STT expects 16 kHz PCM")
+        return self._submit(("pcm", pcm))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": self.name, "model": self.model_name, "workers": self.workers, **self._counters}
+
+
+_backend: Optional[STTBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> STTBackend:
+    """The configured backend; falls back to Groq if the local engine can't start"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if STT_BACKEND == "local":
+                    try:
+                        _backend = LocalWhisperSTT()
+                    except Exception as e:
+                        print(f"❌ Local STT unavailable, using Groq: {e}")
+                        _backend = GroqSTT()
+                else:
+                    _backend = GroqSTT()
+    return _backend
@@ -0,0 +1,214 @@
+"""
+Text-to-speech with a phrase cache.
+
+Synthesized audio is cached by a hash of (engine, language, normalized text)
+in an in-memory LRU and, when TTS_CACHE_DIR is set, on disk, so fixed
+prompts ("I didn't hear anything...") and repeated questions are synthesized
+once. stream_speech() yields audio as each sentence-sized part is
+synthesized, which lets the /tts endpoint start playback before a long
+question is finished. Everything is in memory; there is no shared out.mp3.
+
+For local playback, synthesize_pcm() returns samples ready for sounddevice.
+With TTS_BACKEND=piper and PIPER_MODEL pointing at a voice (.onnx) it uses
+the Piper synthesizer on the CPU in a background worker thread: no network
+round-trip and no MP3 encode/decode. If Piper is not installed or the voice
+can't be loaded, gTTS is used instead. The /tts endpoint always serves MP3.
+
+Calls block and are meant for CLI code or worker threads.
+"""
+import io
+import os
+import hashlib
+import threading
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+from gtts import gTTS
+from gtts.lang import tts_langs
+
+from content_cache import ContentCache
+
+TTS_LANG = os.getenv("TTS_LANG", "en")
+# Phrases kept in memory
+TTS_CACHE_SIZE = int(os.getenv("TTS_CACHE_SIZE", "256"))
+# Directory for the on-disk tier; unset keeps the cache memory-only
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR")
+TTS_CACHE_DISK_ENTRIES = int(os.getenv("TTS_CACHE_DISK_ENTRIES", "5000"))
+# Longest text accepted by the HTTP endpoint
+TTS_MAX_CHARS = int(os.getenv("TTS_MAX_CHARS", "2000"))
+# Size of the chunks cached audio is streamed in
+TTS_STREAM_CHUNK_BYTES = int(os.getenv("TTS_STREAM_CHUNK_BYTES", "16384"))
+# Engine for local playback: "gtts" or "piper" (pip install piper-tts)
+TTS_BACKEND = os.getenv("TTS_BACKEND", "gtts").lower()
+PIPER_MODEL = os.getenv("PIPER_MODEL", "")
+
+ENGINE = "gtts"
+MEDIA_TYPE = "audio/mpeg"
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def phrase_key(text: str, lang: str = TTS_LANG, engine: str = ENGINE) -> str:
+    payload = f"{engine}\x00{lang}\x00{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PhraseCache(ContentCache[bytes]):
+    """Synthesized audio by phrase_key(); memory and optional disk tier"""
+
+    def __init__(self, max_entries: int = TTS_CACHE_SIZE, directory: Optional[str] = TTS_CACHE_DIR,
+                 max_disk_entries: int = TTS_CACHE_DISK_ENTRIES, suffix: str = ".mp3"):
+        super().__init__(max_entries, directory, max_disk_entries, suffix=suffix, name="TTS cache")
+
+    def put(self, key: str, audio: bytes):
+        if audio:
+            super().put(key, audio)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "bytes": self.values_size(len)}
+
+
+phrase_cache = PhraseCache()
+
+
+def validate_request(text: str, lang: str = TTS_LANG):
+    """
+    Raise ValueError for text or a language gTTS would reject. stream_speech()
+    only runs gTTS once the response has started, so callers check first.
+    """
+    if not text.strip():
+        raise ValueError("Empty text")
+    if len(text) > TTS_MAX_CHARS:
+        raise ValueError(f"Text longer than {TTS_MAX_CHARS} characters")
+    if lang not in _supported_langs():
+        raise ValueError(f"Unsupported language: {lang}")
+
+
+@lru_cache(maxsize=1)
+def _supported_langs() -> frozenset:
+    return frozenset(tts_langs())
+
+
+def synthesize(text: str, lang: str = TTS_LANG) -> bytes:
+    """MP3 for `text`, from the cache when possible"""
+    key = phrase_key(text, lang)
+    audio = phrase_cache.get(key)
+    if audio is None:
+        buffer = io.BytesIO()
+        gTTS(text=normalize_text(text), lang=lang).write_to_fp(buffer)
+        audio = buffer.getvalue()
+        phrase_cache.put(key, audio)
+    return audio
+
+
+def stream_speech(text: str, lang: str = TTS_LANG) -> Iterator[bytes]:
+    """
+    Yield MP3 data as it becomes available. A cache miss yields each part as
+    gTTS synthesizes it (MP3 frames concatenate cleanly) and caches the whole
+    phrase once the last part is done.
+    """
+    key = phrase_key(text, lang)
+    audio = phrase_cache.get(key)
+    if audio is not None:
+        for offset in range(0, len(audio), TTS_STREAM_CHUNK_BYTES):
+            yield audio[offset:offset + TTS_STREAM_CHUNK_BYTES]
+        return
+    parts = []
+    for part in gTTS(text=normalize_text(text), lang=lang).stream():
+        parts.append(part)
+        yield part
+    phrase_cache.put(key, b"".join(parts))
+
+
+class PiperTTS:
+    """
+    Piper voice owned by a single background thread. Synthesis returns raw
+    16-bit mono PCM; results share the phrase cache LRU/disk logic under
+    their own engine key.
+    """
+
+    def __init__(self, model_path: str = PIPER_MODEL):
+        if not model_path:
+            raise RuntimeError("PIPER_MODEL is not set")
+        try:
+            from piper import PiperVoice
+        except ImportError as e:
+            raise RuntimeError("piper-tts not installed. Run: pip install piper-tts") from e
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        self._voice = self._worker.submit(PiperVoice.load, model_path).result()
+        self.sample_rate = self._voice.config.sample_rate
+        self.engine = f"piper:{os.path.basename(model_path)}"
+        self.cache = PhraseCache(suffix=".pcm")
+        # phrase key -> synthesis in progress, so a repeated phrase waits on the same job
+        self._pending: Dict[str, "Future[bytes]"] = {}
+        self._pending_lock = threading.Lock()
+
+    def _synthesize(self, text: str) -> bytes:
+        voice = self._voice
+        if hasattr(voice, "synthesize_stream_raw"):
+            return b"".join(voice.synthesize_stream_raw(text))
+        return b"".join(chunk.audio_int16_bytes for chunk in voice.synthesize(text))
+
+    def submit(self, text: str) -> "Future[bytes]":
+        """Synthesize in the background; the future resolves to PCM"""
+        key = phrase_key(text, engine=self.engine)
+        pcm = self.cache.get(key)
+        if pcm is not None:
+            future: "Future[bytes]" = Future()
+            future.set_result(pcm)
+            return future
+        with self._pending_lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._worker.submit(self._synthesize, normalize_text(text))
+            self._pending[key] = future
+        # Outside the lock: the callback runs right here if the job already finished
+        future.add_done_callback(lambda f: self._remember(key, f))
+        return future
+
+    def _remember(self, key: str, future: "Future[bytes]"):
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+        with self._pending_lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+
+_local_engine: Optional[PiperTTS] = None
+_local_engine_checked = False
+_local_engine_lock = threading.Lock()
+
+
+def local_engine() -> Optional[PiperTTS]:
+    """The Piper engine if TTS_BACKEND=piper and it loads, else None"""
+    global _local_engine, _local_engine_checked
+    if not _local_engine_checked:
+        with _local_engine_lock:
+            if not _local_engine_checked:
+                if TTS_BACKEND == "piper":
+                    try:
+                        _local_engine = PiperTTS()
+                        print(f"✅ Local TTS ready: {_local_engine.engine}")
+                    except Exception as e:
+                        print(f"❌ Local TTS unavailable, using gTTS: {e}")
+                _local_engine_checked = True
+    return _local_engine
+
+
+def synthesize_pcm(text: str, lang: str = TTS_LANG) -> Tuple[np.ndarray, int]:
+    """(samples, sample_rate) for sd.play(): Piper PCM if available, else decoded gTTS MP3"""
+    engine = local_engine()
+    if engine is not None and lang == TTS_LANG:
+        try:
+            pcm = engine.submit(text).result()
+            return np.frombuffer(pcm, dtype=np.int16), engine.sample_rate
+        except Exception as e:
+            print(f"⚠️ Local TTS failed, using gTTS: {e}")
+    data, sample_rate = sf.read(io.BytesIO(synthesize(text, lang)), dtype="float32")
+    return data, sample_rate
@@ -1,7 +1,7 @@
 import soundfile as sf
 import numpy as np
-import webrtcvad
 import pyaudio
+from vad import StreamingEndpointer, UTTERANCE_START, UTTERANCE_END, NO_SPEECH, MAX_DURATION
 
 # --- Topic Options ---
 TOPIC_OPTIONS = [
@@ -12,6 +12,15 @@ FRAME_DURATION = 30  # ms
 FRAME_SIZE = int(SAMPLE_RATE * FRAME_DURATION / 1000)
 CHANNELS = 1
 FORMAT = pyaudio.paInt16
+# VAD frames per microphone read; the endpointer handles any buffer size
+READ_FRAMES = 4
+
+VAD_EVENT_MESSAGES = {
+    UTTERANCE_START: "Speech detected",
+    UTTERANCE_END: "Silence threshold reached, stopping recording.",
+    NO_SPEECH: "No speech detected for too long, stopping.",
+    MAX_DURATION: "Maximum answer length reached, stopping recording.",
+}
 
 def build_interviewer_prompt(topics):
     topics_str = ", ".join(topics)
@@ -70,48 +79,23 @@ def get_user_topics():
         chosen = TOPIC_OPTIONS
     return chosen
 
-def record_with_vad(filename="answer.wav"):
+def record_utterance():
+    """Record one answer from the local microphone; returns (pcm, heard_speech) in memory"""
     print("Listening for speech...")
-    vad = webrtcvad.Vad(3)  # Lower aggressiveness for better detection
+    endpointer = StreamingEndpointer(sample_rate=SAMPLE_RATE, frame_ms=FRAME_DURATION)
     
     p = pyaudio.PyAudio()
     stream = p.open(format=FORMAT,
                     channels=CHANNELS,
                     rate=SAMPLE_RATE,
                     input=True,
-                    frames_per_buffer=FRAME_SIZE)
-    
-    frames = []
-    silence_count = 0
-    speech_started = False
-    max_silence = 60  # ~1.8s of silence to stop
+                    frames_per_buffer=FRAME_SIZE * READ_FRAMES)
     
     try:
-        while True:
-            audio_chunk = stream.read(FRAME_SIZE, exception_on_overflow=False)
-            is_speech = vad.is_speech(audio_chunk, SAMPLE_RATE)
-            
-            if is_speech:
-                print("Speech detected")
-                frames.append(audio_chunk)
-                silence_count = 0
-                speech_started = True
-            else:
-                print("Silence detected")
-                silence_count += 1
-                if speech_started:  # Only add silence frames after speech has started
-                    frames.append(audio_chunk)
-            
-            # Stop recording after speech has started and enough silence is detected
-            if speech_started and silence_count > max_silence:
-                print("Silence threshold reached, stopping recording.")
-                break
-                
-            # Safety break - don't record forever if no speech detected
-            if not speech_started and silence_count > 200:
-                print("No speech detected for too long, stopping.")
-                break
-                
+        while not endpointer.finished:
+            audio_chunk = stream.read(FRAME_SIZE * READ_FRAMES, exception_on_overflow=False)
+            for event in endpointer.feed(audio_chunk):
+                print(VAD_EVENT_MESSAGES[event])
     except KeyboardInterrupt:
         print("Recording stopped by user.")
     finally:
@@ -119,15 +103,13 @@ def record_with_vad(filename="answer.wav"):
         stream.close()
         p.terminate()
     
-    if frames:
-        # Concatenate all frames
-        audio_data = b''.join(frames)
-        # Convert to NumPy array for soundfile
-        audio_np = np.frombuffer(audio_data, dtype=np.int16)
-        sf.write(filename, audio_np, SAMPLE_RATE)
-        return filename, True
-    else:
-        print("No audio recorded")
-        # Create empty file
-        sf.write(filename, np.array([]), SAMPLE_RATE)
-        return filename, False
\ No newline at end of file
+    if endpointer.speech_started:
+        return endpointer.utterance(trim=True), True
+    print("No audio recorded")
+    return b"", False
+
+def record_with_vad(filename="answer.wav"):
+    """record_utterance, saved to a WAV file (for playback / debugging)"""
+    pcm, heard_speech = record_utterance()
+    sf.write(filename, np.frombuffer(pcm, dtype=np.int16), SAMPLE_RATE)
+    return filename, heard_speech
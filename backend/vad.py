@@ -0,0 +1,233 @@
+"""
+Streaming voice-activity endpointing.
+
+StreamingEndpointer consumes 16-bit mono PCM in buffers of any size and
+reports when an utterance starts and ends. Each block of complete 30 ms
+frames first goes through a vectorized NumPy RMS gate: frames below
+VAD_ENERGY_THRESHOLD count as silence without calling webrtcvad, and a block
+with no loud frame at all is settled in one step. Audio is kept in a
+ring buffer that is allocated once per utterance, so long answers never grow
+a list of byte strings.
+
+Used by utils.record_utterance and cli_pipeline.InterviewPipeline (CLI,
+local microphone) and by audio_stream.AudioStream (audio streamed over the
+WebSocket).
+"""
+import os
+from typing import List, Optional
+
+import numpy as np
+import webrtcvad
+
+VAD_AGGRESSIVENESS = int(os.getenv("VAD_AGGRESSIVENESS", "3"))
+# Frames quieter than this RMS (int16 scale) skip webrtcvad entirely
+VAD_ENERGY_THRESHOLD = float(os.getenv("VAD_ENERGY_THRESHOLD", "200"))
+# Consecutive speech needed to open an utterance
+VAD_START_MS = int(os.getenv("VAD_START_MS", "30"))
+# Trailing silence (hangover) that closes an utterance
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "1800"))
+# Give up if no speech starts within this window
+VAD_NO_SPEECH_MS = int(os.getenv("VAD_NO_SPEECH_MS", "6000"))
+# Audio kept from before the detected start so the first syllable isn't clipped
+VAD_PRE_ROLL_MS = int(os.getenv("VAD_PRE_ROLL_MS", "300"))
+# Silence kept after the last speech frame when the hangover is trimmed off
+VAD_TRAILING_PAD_MS = int(os.getenv("VAD_TRAILING_PAD_MS", "200"))
+VAD_MAX_UTTERANCE_SECONDS = float(os.getenv("VAD_MAX_UTTERANCE_SECONDS", "120"))
+
+UTTERANCE_START = "utterance_start"
+UTTERANCE_END = "utterance_end"
+NO_SPEECH = "no_speech"
+MAX_DURATION = "max_duration"
+
+_WAITING, _SPEAKING, _DONE = range(3)
+
+
+class StreamingEndpointer:
+    """
+    Incremental endpointer. feed() returns the events raised by that buffer
+    (UTTERANCE_START, then one of UTTERANCE_END / NO_SPEECH / MAX_DURATION).
+    After a closing event further audio is ignored until reset().
+
+    With endpointing=False only UTTERANCE_START and MAX_DURATION are raised;
+    the caller decides when the utterance ends and gets all buffered audio.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30,
+                 aggressiveness: int = VAD_AGGRESSIVENESS,
+                 energy_threshold: float = VAD_ENERGY_THRESHOLD,
+                 start_ms: int = VAD_START_MS,
+                 hangover_ms: int = VAD_HANGOVER_MS,
+                 no_speech_ms: int = VAD_NO_SPEECH_MS,
+                 pre_roll_ms: int = VAD_PRE_ROLL_MS,
+                 trailing_pad_ms: int = VAD_TRAILING_PAD_MS,
+                 max_utterance_seconds: float = VAD_MAX_UTTERANCE_SECONDS,
+                 endpointing: bool = True):
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.energy_threshold = energy_threshold
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.no_speech_frames = max(1, no_speech_ms // frame_ms)
+        self.pre_roll = sample_rate * pre_roll_ms // 1000
+        self.trailing_pad = sample_rate * trailing_pad_ms // 1000
+        self.capacity = int(max_utterance_seconds * sample_rate)
+        self.endpointing = endpointing
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self._ring: Optional[np.ndarray] = None
+        # Counters for tuning the gate
+        self.frames_gated = 0
+        self.frames_classified = 0
+        self.reset()
+
+    def reset(self):
+        """Start listening for a new utterance (the ring buffer is reused)"""
+        self._state = _WAITING
+        self._total = 0          # samples written since reset
+        self._framed = 0         # samples already classified
+        self._start = 0          # first sample of the utterance
+        self._end: Optional[int] = None
+        self._speech_run = 0
+        self._silent_frames = 0
+        self._start_seen = False
+        self._last_speech = 0    # end of the last frame classified as speech
+        self._carry = np.empty(0, dtype=np.int16)
+        self._odd_byte = b""
+
+    def release(self):
+        """Drop the ring buffer; it is reallocated on the next feed()"""
+        self._ring = None
+
+    @property
+    def speech_started(self) -> bool:
+        return self._start_seen
+
+    @property
+    def finished(self) -> bool:
+        return self._state == _DONE
+
+    @property
+    def duration(self) -> float:
+        return (self._end if self._end is not None else self._total) / self.sample_rate
+
+    # -- input -------------------------------------------------------------
+    def feed(self, pcm: bytes) -> List[str]:
+        if self._state == _DONE or not pcm:
+            return []
+        if self._odd_byte:
+            pcm = self._odd_byte + pcm
+        self._odd_byte = pcm[-1:] if len(pcm) % 2 else b""
+        samples = np.frombuffer(pcm[:len(pcm) - len(self._odd_byte)], dtype=np.int16)
+        if not len(samples):
+            return []
+        self._write(samples)
+
+        block = np.concatenate((self._carry, samples)) if len(self._carry) else samples
+        n_frames = len(block) // self.frame_size
+        usable = n_frames * self.frame_size
+        self._carry = block[usable:].copy()
+
+        events: List[str] = []
+        if n_frames:
+            self._classify(block[:usable].reshape(n_frames, self.frame_size), events)
+        if self._state != _DONE and self._total - self._start >= self.capacity:
+            self._close(self._start + self.capacity, MAX_DURATION, events)
+        return events
+
+    def _write(self, samples: np.ndarray):
+        if self._ring is None:
+            self._ring = np.empty(self.capacity, dtype=np.int16)
+        if len(samples) > self.capacity:
+            self._total += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        pos = self._total % self.capacity
+        first = min(len(samples), self.capacity - pos)
+        self._ring[pos:pos + first] = samples[:first]
+        self._ring[:len(samples) - first] = samples[first:]
+        self._total += len(samples)
+
+    def _classify(self, frames: np.ndarray, events: List[str]):
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        loud = rms >= self.energy_threshold
+        if not loud.any():
+            # Whole block is silent: no per-frame work at all
+            self.frames_gated += len(frames)
+            self._silence(len(frames), events)
+            self._framed += len(frames) * self.frame_size
+            return
+        for i, frame in enumerate(frames):
+            if self._state == _DONE:
+                return
+            if loud[i]:
+                self.frames_classified += 1
+                is_speech = self._vad.is_speech(frame.tobytes(), self.sample_rate)
+            else:
+                self.frames_gated += 1
+                is_speech = False
+            if is_speech:
+                self._speech(events)
+            else:
+                self._silence(1, events)
+            self._framed += self.frame_size
+
+    # -- state machine -----------------------------------------------------
+    def _speech(self, events: List[str]):
+        self._silent_frames = 0
+        self._last_speech = self._framed + self.frame_size
+        if self._state == _WAITING:
+            self._speech_run += 1
+            if self._speech_run >= self.start_frames:
+                onset = self._framed - (self._speech_run - 1) * self.frame_size
+                self._start = max(0, onset - self.pre_roll, self._total - self.capacity)
+                self._state = _SPEAKING
+                self._start_seen = True
+                events.append(UTTERANCE_START)
+
+    def _silence(self, count: int, events: List[str]):
+        if self._state == _WAITING:
+            self._speech_run = 0
+        self._silent_frames += count
+        if not self.endpointing:
+            return
+        if self._state == _SPEAKING and self._silent_frames > self.hangover_frames:
+            self._close(self._framed + count * self.frame_size, UTTERANCE_END, events)
+        elif self._state == _WAITING and self._silent_frames > self.no_speech_frames:
+            self._close(self._framed + count * self.frame_size, NO_SPEECH, events)
+
+    def _close(self, end: int, event: str, events: List[str]):
+        self._end = min(end, self._total)
+        self._state = _DONE
+        events.append(event)
+
+    # -- output ------------------------------------------------------------
+    def utterance(self, offset: int = 0, length: Optional[int] = None, trim: bool = False) -> bytes:
+        """
+        PCM of the current utterance: from the detected start (minus pre-roll)
+        to the closing frame, or everything buffered if speech never started.
+        `offset` / `length` (in samples) select part of it without copying
+        the rest. `trim` cuts the trailing non-speech (the hangover) down to
+        VAD_TRAILING_PAD_MS after the last speech frame.
+        """
+        if self._ring is None:
+            return b""
+        begin, end = self._bounds()
+        if trim and self._start_seen:
+            end = min(end, self._last_speech + self.trailing_pad)
+        start = begin + offset
+        if length is not None:
+            end = min(end, start + length)
+        if end <= start:
+            return b""
+        first, last = start % self.capacity, end % self.capacity
+        if first < last or last == 0:
+            return self._ring[first:last or self.capacity].tobytes()
+        return self._ring[first:].tobytes() + self._ring[:last].tobytes()
+
+    @property
+    def buffered_samples(self) -> int:
+        """Length of the current utterance in samples"""
+        begin, end = self._bounds()
+        return max(0, end - begin)
+
+    def _bounds(self):
+        end = self._end if self._end is not None else self._total
+        return max(self._start, end - self.capacity, self._total - self.capacity), end
@@ -0,0 +1,135 @@
+"""
+Per-session write-behind buffer for technical interview persistence.
+
+Question responses and progress updates are queued in memory and written
+in the background, so feedback reaches the candidate without waiting for
+Supabase. A flush sends all buffered responses as one multi-row insert and
+only the latest progress state (updates are coalesced). Flushes happen
+DB_FLUSH_INTERVAL_SECONDS after the first buffered write, as soon as
+DB_FLUSH_MAX_ROWS responses are waiting, and explicitly on interview
+completion, disconnect and server shutdown. Writes that fail stay buffered
+and are retried by the next flush; a progress update is dropped after
+DB_FLUSH_PROGRESS_ATTEMPTS consecutive failures.
+"""
+import os
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import db
+
+DB_FLUSH_INTERVAL_SECONDS = float(os.getenv("DB_FLUSH_INTERVAL_SECONDS", "5"))
+DB_FLUSH_MAX_ROWS = int(os.getenv("DB_FLUSH_MAX_ROWS", "20"))
+# Attempts made by close() before giving up on buffered writes
+DB_FLUSH_CLOSE_ATTEMPTS = int(os.getenv("DB_FLUSH_CLOSE_ATTEMPTS", "3"))
+# Consecutive failed progress writes before the pending update is dropped
+DB_FLUSH_PROGRESS_ATTEMPTS = int(os.getenv("DB_FLUSH_PROGRESS_ATTEMPTS", "5"))
+
+
+class SessionWriter:
+    def __init__(self, session_id: str, database=db,
+                 flush_interval: float = DB_FLUSH_INTERVAL_SECONDS, max_rows: int = DB_FLUSH_MAX_ROWS):
+        self.session_id = session_id
+        self.database = database
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        # Awaited before the first write (e.g. creation of the interviews row the responses reference)
+        self.ready: Optional[asyncio.Future] = None
+        self._responses: List[Tuple[int, Dict[str, Any]]] = []
+        self._progress: Optional[Dict[str, Any]] = None
+        self._progress_failures = 0
+        self._timer: Optional[asyncio.Task] = None
+        # Size-triggered flush started by add_response; close() waits for it
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.counters: Dict[str, int] = {"flushes": 0, "rows_written": 0, "progress_coalesced": 0, "failures": 0,
+                                        "progress_dropped": 0}
+
+    @property
+    def pending(self) -> int:
+        return len(self._responses) + (self._progress is not None)
+
+    def add_response(self, question_index: int, question_data: Dict[str, Any]):
+        """Buffer one question_responses row (question_index is 1-based)"""
+        self._responses.append((question_index, {"created_at": datetime.utcnow().isoformat(), **question_data}))
+        if len(self._responses) >= self.max_rows and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+        else:
+            self._schedule()
+
+    def set_progress(self, progress_data: Dict[str, Any]):
+        """Buffer a progress update; only the latest one is written"""
+        if self._progress is not None:
+            self.counters["progress_coalesced"] += 1
+        self._progress = dict(progress_data)
+        self._schedule()
+
+    def _schedule(self):
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> bool:
+        """Write everything buffered; True if nothing is left pending"""
+        async with self._lock:
+            if self.ready is not None:
+                await asyncio.shield(self.ready)
+            responses, self._responses = self._responses, []
+            progress, self._progress = self._progress, None
+            if not responses and progress is None:
+                return True
+            if not self.database.supabase:
+                # No database configured: nothing to retry against
+                return True
+            self.counters["flushes"] += 1
+            if responses:
+                if await self.database.store_question_responses(self.session_id, responses):
+                    self.counters["rows_written"] += len(responses)
+                else:
+                    self.counters["failures"] += 1
+                    self._responses[:0] = responses
+            if progress is not None:
+                if await self.database.update_interview_progress(self.session_id, progress):
+                    self._progress_failures = 0
+                else:
+                    self.counters["failures"] += 1
+                    self._progress_failures += 1
+                    if self._progress_failures >= DB_FLUSH_PROGRESS_ATTEMPTS:
+                        # e.g. the interviews row was never created: stop retrying every interval
+                        print(f"❌ Dropping progress update for session {self.session_id} "
+                              f"after {self._progress_failures} failed attempts")
+                        self._progress_failures = 0
+                        self.counters["progress_dropped"] += 1
+                    elif self._progress is None:
+                        # Keep it unless a newer update arrived meanwhile
+                        self._progress = progress
+            if self.pending:
+                self._schedule()
+                return False
+            return True
+
+    async def close(self) -> bool:
+        """Final flush (completion, disconnect, shutdown), retried a few times"""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_task is not None:
+            # Let an insert that is already running finish rather than cut it off
+            try:
+                await self._flush_task
+            except Exception as e:
+                print(f"❌ Background flush failed for session {self.session_id}: {e}")
+            self._flush_task = None
+        for attempt in range(DB_FLUSH_CLOSE_ATTEMPTS):
+            if await self.flush():
+                return True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            await asyncio.sleep(0.5 * (attempt + 1))
+        print(f"❌ {self.pending} buffered database writes could not be saved for session: {self.session_id}")
+        return False
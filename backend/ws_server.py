@@ -5,121 +5,65 @@ import tempfile
 import asyncio
 import subprocess
 import time
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 
 # Import all functions from existing modules
-from utils import TOPIC_OPTIONS, build_interviewer_prompt, record_with_vad
-from interview import transcript_is_valid, transcribe, interviewer_reply, INTERVIEWER_PROMPT
+from utils import TOPIC_OPTIONS, SAMPLE_RATE, build_interviewer_prompt, record_utterance
+from interview import transcript_is_valid, interviewer_reply_async
+from audio_stream import AudioStream
+from audio_decoder import INPUT_FORMATS, decoder_pool
+from audio_workers import audio_workers
+from streaming_stt import PartialTranscriber, STT_PARTIAL_TRANSCRIPTS
 from interview_with_resume import read_resume
-from groq import Groq
+import llm_gateway
+import llm_resilience
+import model_routing
+from llm_scheduler import Priority, scheduler
+from question_pool import QuestionPool
+from evaluation_cache import evaluation_cache, evaluation_key
+import tts_service
+import stt_backends
+from conversation_context import ConversationContext, compact_text
+from structured_output import EVALUATION_SCHEMA, QUESTION_SCHEMA, StructuredOutputError, short_text_validator
 
 # Import database operations
 from database import db
+from write_behind import SessionWriter
 
-# Initialize Groq client for LLM-based questions
-api_key = os.getenv("GROQ_API_KEY")
-print(f"🔑 API Key status: {'✅ Found' if api_key else '❌ Missing'}")
-if api_key:
-    print(f"🔑 API Key length: {len(api_key)} characters")
-    print(f"🔑 API Key starts with: {api_key[:8]}...")
-
-if not api_key:
+if not llm_gateway.is_available():
     print("WARNING: GROQ_API_KEY not found in environment variables")
     print("Add your API key to .env file or set as environment variable")
-    client = None
-else:
-    try:
-        client = Groq(api_key=api_key)
-        print("✅ Groq client initialized successfully")
-        
-        # Test the client immediately
-        try:
-            test_response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": "Reply with just: OK"}],
-                temperature=0.1,
-                max_tokens=10
-            )
-            test_content = test_response.choices[0].message.content
-            print(f"🧪 Client test successful: '{test_content}'")
-        except Exception as test_e:
-            print(f"⚠️ Client test failed: {test_e}")
-            client = None
-            
-    except Exception as e:
-        print(f"❌ Failed to initialize Groq client: {e}")
-        client = None
 
 
 # -----------------------------
 # Technical Interview Questions Database - Now LLM-Generated
 # -----------------------------
-def extract_json_from_response(response_text: str) -> str:
-    """
-    Extract JSON from LLM response that might contain extra text
-    """
-    import re
-    
-    # Try to find JSON within the response
-    json_pattern = r'\{.*\}'
-    matches = re.findall(json_pattern, response_text, re.DOTALL)
-    
-    if matches:
-        # Return the largest JSON-like match (most likely to be complete)
-        return max(matches, key=len)
-    
-    return response_text.strip()
-
-
-def repair_json_string(json_str: str) -> str:
-    """
-    Attempt to repair common JSON formatting issues
-    """
-    import re
-    
-    # Remove any leading/trailing whitespace
-    json_str = json_str.strip()
-    
-    # Remove any markdown code block markers
-    json_str = re.sub(r'^```json\s*', '', json_str, flags=re.MULTILINE)
-    json_str = re.sub(r'^```\s*', '', json_str, flags=re.MULTILINE)
-    json_str = re.sub(r'```\s*$', '', json_str, flags=re.MULTILINE)
-    
-    # Fix common quote issues
-    json_str = re.sub(r'[\u201c\u201d]', '"', json_str)  # Replace smart quotes
-    json_str = re.sub(r'[\u2018\u2019]', "'", json_str)  # Replace smart apostrophes
-    
-    return json_str.strip()
+def fallback_technical_question(topics: List[str], difficulty: str) -> dict:
+    """Simple templated question used when the LLM is unavailable or fails"""
+    return {
+        "question": f"Write a function to solve a {difficulty} problem related to {', '.join(topics)}. Explain your approach first.",
+        "difficulty": difficulty,
+        "topics": topics,
+        "hints": ["Think about the data structures you need", "Consider the time complexity", "Don't forget edge cases"],
+        "test_cases": [{"input": "test input", "output": "expected output", "explanation": "basic test case"}],
+        "evaluation_criteria": ["Problem approach", "Code implementation", "Edge cases"]
+    }
 
 
-def generate_technical_question(topics: List[str], difficulty: str = "medium") -> dict:
+async def request_technical_question(topics: List[str], difficulty: str = "medium",
+                                     priority: Priority = Priority.QUESTION_GENERATION) -> dict:
     """
-    Generate a technical interview question using LLM based on selected topics
+    Ask the LLM for a technical interview question. Raises on any failure so
+    callers (the question pool in particular) never mistake a fallback for a
+    generated question.
     """
-    import json
-    
-    print(f"🎯 Generating {difficulty} question for topics: {topics}")
-    
-    if not client:
-        print("❌ Groq client not available, using fallback question")
-        fallback = {
-            "question": f"Write a function to solve a {difficulty} problem related to {', '.join(topics)}. Explain your approach first.",
-            "difficulty": difficulty,
-            "topics": topics,
-            "hints": ["Think about the data structures you need", "Consider the time complexity", "Don't forget edge cases"],
-            "test_cases": [{"input": "test input", "output": "expected output", "explanation": "basic test case"}],
-            "evaluation_criteria": ["Problem approach", "Code implementation", "Edge cases"]
-        }
-        print(f"📝 Fallback question: {fallback['question'][:50]}...")
-        return fallback
-        
     topics_str = ", ".join(topics)
     
     prompt = f"""
@@ -151,85 +95,68 @@ Format your response exactly like this (no extra text, no markdown):
     
     print(f"📤 Sending prompt to LLM...")
     
+    question_data = await llm_gateway.chat_json(
+        messages=[
+            {"role": "system", "content": "You are a technical interviewer. Always respond with valid JSON only. Never use markdown formatting or extra text."},
+            {"role": "user", "content": prompt}
+        ],
+        schema=QUESTION_SCHEMA,
+        temperature=0.2,  # Very low temperature for consistent formatting
+        max_tokens=600,
+        priority=priority,
+        call_site="question_generation"
+    )
+    print(f"✅ JSON parsing successful")
+    
+    print(f"📋 Generated question: {question_data['question'][:50]}...")
+    
+    # Ensure all required fields have default values
+    question_data.setdefault('difficulty', difficulty)
+    question_data.setdefault('topics', topics)
+    question_data.setdefault('hints', ["Consider the problem step by step", "Think about edge cases", "Optimize your solution"])
+    question_data.setdefault('test_cases', [{"input": "example", "output": "result", "explanation": "test case"}])
+    question_data.setdefault('evaluation_criteria', ["Correctness", "Approach", "Code quality"])
+    
+    return question_data
+
+
+async def generate_technical_question(topics: List[str], difficulty: str = "medium") -> dict:
+    """
+    Generate a technical interview question using LLM based on selected topics
+    """
+    print(f"🎯 Generating {difficulty} question for topics: {topics}")
+    
+    if not llm_gateway.is_available() or llm_gateway.is_degraded():
+        print("❌ Groq client not available or degraded, using fallback question")
+        fallback = fallback_technical_question(topics, difficulty)
+        print(f"📝 Fallback question: {fallback['question'][:50]}...")
+        return fallback
+    
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a technical interviewer. Always respond with valid JSON only. Never use markdown formatting or extra text."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2,  # Very low temperature for consistent formatting
-            max_tokens=600
-        )
-        
-        response_content = response.choices[0].message.content
-        print(f"📥 Raw LLM Response Length: {len(response_content) if response_content else 0}")
-        print(f"📥 Raw LLM Response Preview: {response_content[:100] if response_content else 'EMPTY'}...")
-        
-        if not response_content or response_content.strip() == "":
-            print("❌ Empty response from LLM for question generation")
-            raise Exception("Empty LLM response")
-        
-        # Clean response immediately
-        response_content = response_content.strip()
-        original_content = response_content
-        
-        # Remove any markdown code block markers
-        if response_content.startswith('```'):
-            lines = response_content.split('\n')
-            # Remove first line if it's ```json or ```
-            if lines[0].strip() in ['```json', '```']:
-                lines = lines[1:]
-            # Remove last line if it's ```
-            if lines[-1].strip() == '```':
-                lines = lines[:-1]
-            response_content = '\n'.join(lines).strip()
-        
-        print(f"🧹 Cleaned Response Length: {len(response_content)}")
-        print(f"🧹 Cleaned Response Preview: {response_content[:100]}...")
-        
-        if original_content != response_content:
-            print("✂️ Markdown cleanup applied")
-        
-        question_data = json.loads(response_content)
-        print(f"✅ JSON parsing successful")
-        
-        # Validate required fields
-        if not isinstance(question_data, dict) or 'question' not in question_data:
-            print(f"❌ Invalid question data structure: {type(question_data)}")
-            raise Exception("Invalid question format")
-        
-        print(f"📋 Generated question: {question_data['question'][:50]}...")
-        
-        # Ensure all required fields have default values
-        question_data.setdefault('difficulty', difficulty)
-        question_data.setdefault('topics', topics)
-        question_data.setdefault('hints', ["Consider the problem step by step", "Think about edge cases", "Optimize your solution"])
-        question_data.setdefault('test_cases', [{"input": "example", "output": "result", "explanation": "test case"}])
-        question_data.setdefault('evaluation_criteria', ["Correctness", "Approach", "Code quality"])
-        
-        return question_data
-            
+        return await request_technical_question(topics, difficulty)
     except Exception as e:
         print(f"Error generating question: {e}")
         # Fallback to a simple question
-        return {
-            "question": f"Write a function to solve a {difficulty} problem related to {topics_str}. Explain your approach first.",
-            "difficulty": difficulty,
-            "topics": topics,
-            "hints": ["Think about the data structures you need", "Consider the time complexity", "Don't forget edge cases"],
-            "test_cases": [{"input": "test input", "output": "expected output", "explanation": "basic test case"}],
-            "evaluation_criteria": ["Problem approach", "Code implementation", "Edge cases"]
-        }
+        return fallback_technical_question(topics, difficulty)
+
+
+# Sessions draw from this pool first; live generation is only the fallback
+question_pool = QuestionPool(
+    lambda topics, difficulty: request_technical_question(topics, difficulty, priority=Priority.BACKGROUND)
+)
 
 # -----------------------------
 # Technical Interview Session Management
 # -----------------------------
+QUESTION_DIFFICULTIES = ["easy", "medium", "medium", "hard"]  # Progressive difficulty
+
 class TechnicalSession:
     def __init__(self, topics: List[str]):
         print(f"🏁 Initializing TechnicalSession with topics: {topics}")
         self.topics = topics
-        self.questions = []
+        # One slot per question; slots are filled concurrently by start_question_generation()
+        self.questions: List[Optional[dict]] = [None] * len(QUESTION_DIFFICULTIES)
+        self._question_tasks: List[asyncio.Task] = []
         self.current_question_index = 0
         self.session_id = str(uuid.uuid4())
         self.start_time = time.time()
@@ -243,40 +170,74 @@ class TechnicalSession:
         self.final_evaluation = None  # Store detailed LLM evaluation
         self.question_submitted = False  # Track if current question was already submitted
         self.interview_id = None  # Will be set when creating database record
+        self.db_writer = SessionWriter(self.session_id)  # Buffers responses / progress for the database
         
-        print(f"🔧 Client status: {'✅ Available' if client else '❌ Not available'}")
-        
-        # Generate questions using LLM based on selected topics
-        difficulties = ["easy", "medium", "medium", "hard"]  # Progressive difficulty
-        print(f"📝 Starting to generate {len(difficulties)} questions...")
-        
-        for i, difficulty in enumerate(difficulties):
-            if i < 4:  # Generate up to 4 questions
-                print(f"📝 Generating question {i+1}/{len(difficulties)} (difficulty: {difficulty})")
-                try:
-                    question = generate_technical_question(topics, difficulty)
-                    question['id'] = i + 1
-                    self.questions.append(question)
-                    print(f"✅ Question {i+1} generated successfully: {question.get('question', 'Unknown')[:70]}...")
-                except Exception as e:
-                    print(f"❌ Failed to generate question {i+1}: {e}")
-                    # Add fallback question
-                    fallback_question = {
-                        "id": i + 1,
-                        "question": f"Write a function to solve a {difficulty} problem related to {', '.join(topics)}. Explain your approach.",
-                        "difficulty": difficulty,
-                        "topics": topics,
-                        "hints": ["Think step by step", "Consider edge cases"],
-                        "test_cases": [{"input": "example", "output": "result", "explanation": "test"}],
-                        "evaluation_criteria": ["Correctness", "Approach"]
-                    }
-                    self.questions.append(fallback_question)
-                    print(f"🔄 Added fallback question {i+1}")
-        
-        print(f"🎯 Session initialization complete. Generated {len(self.questions)} questions")
+        print(f"🔧 Client status: {'✅ Available' if llm_gateway.is_available() else '❌ Not available'}")
+    
+    @classmethod
+    async def create(cls, topics: List[str]) -> "TechnicalSession":
+        """Build a session and start generating all questions concurrently"""
+        session = cls(topics)
+        session.start_question_generation()
         
-        # Initialize database record asynchronously
-        asyncio.create_task(self._initialize_database_record())
+        # Initialize database record asynchronously; buffered writes wait for it
+        session.db_writer.ready = asyncio.create_task(session._initialize_database_record())
+        return session
+    
+    def start_question_generation(self):
+        """Fan out one LLM generation per question; each slot fills in as soon as it is ready"""
+        print(f"📝 Starting to generate {len(QUESTION_DIFFICULTIES)} questions concurrently...")
+        self._question_tasks = [
+            asyncio.create_task(self._generate_question(i, difficulty))
+            for i, difficulty in enumerate(QUESTION_DIFFICULTIES)
+        ]
+    
+    async def _generate_question(self, index: int, difficulty: str) -> dict:
+        print(f"📝 Generating question {index+1}/{len(QUESTION_DIFFICULTIES)} (difficulty: {difficulty})")
+        try:
+            question = question_pool.take(self.topics, difficulty)
+            if question is not None:
+                print(f"♻️ Question {index+1} served from pool")
+            else:
+                question = await generate_technical_question(self.topics, difficulty)
+            question['id'] = index + 1
+            print(f"✅ Question {index+1} generated successfully: {question.get('question', 'Unknown')[:70]}...")
+        except Exception as e:
+            print(f"❌ Failed to generate question {index+1}: {e}")
+            # Add fallback question
+            question = {
+                "id": index + 1,
+                "question": f"Write a function to solve a {difficulty} problem related to {', '.join(self.topics)}. Explain your approach.",
+                "difficulty": difficulty,
+                "topics": self.topics,
+                "hints": ["Think step by step", "Consider edge cases"],
+                "test_cases": [{"input": "example", "output": "result", "explanation": "test"}],
+                "evaluation_criteria": ["Correctness", "Approach"]
+            }
+            print(f"🔄 Added fallback question {index+1}")
+        self.questions[index] = question
+        return question
+    
+    async def wait_for_question(self, index: int) -> Optional[dict]:
+        """Return question `index`, waiting for its generation if it is still in flight"""
+        if index >= len(self.questions):
+            return None
+        if self.questions[index] is None and index < len(self._question_tasks):
+            # shield so a cancelled handler doesn't cancel generation for the whole session
+            await asyncio.shield(self._question_tasks[index])
+        return self.questions[index]
+    
+    async def wait_for_current_question(self) -> Optional[dict]:
+        return await self.wait_for_question(self.current_question_index)
+    
+    def generated_questions(self) -> List[dict]:
+        """Questions that have finished generating, in order"""
+        return [q for q in self.questions if q is not None]
+    
+    def cancel_pending_generation(self):
+        for task in self._question_tasks:
+            if not task.done():
+                task.cancel()
     
     async def _initialize_database_record(self):
         """Initialize the database record for this interview session"""
@@ -297,19 +258,15 @@ class TechnicalSession:
         except Exception as e:
             print(f"❌ Error initializing database record: {e}")
     
-    async def update_progress_in_db(self):
-        """Update interview progress in database"""
-        try:
-            progress_data = {
-                "current_question_index": self.current_question_index,
-                "completed_questions": len([s for s in self.scores if s is not None])
-            }
-            await db.update_interview_progress(self.session_id, progress_data)
-        except Exception as e:
-            print(f"❌ Error updating progress in database: {e}")
+    def update_progress_in_db(self):
+        """Queue an interview progress update (coalesced with any not yet written)"""
+        self.db_writer.set_progress({
+            "current_question_index": self.current_question_index,
+            "completed_questions": len([s for s in self.scores if s is not None])
+        })
     
-    async def store_question_response_in_db(self, question_index: int, user_response: str, score: int, feedback: str):
-        """Store individual question response in database"""
+    def store_question_response_in_db(self, question_index: int, user_response: str, score: int, feedback: str):
+        """Queue an individual question response for the next batched insert"""
         try:
             # Convert internal 0-based question_index to 1-based for storage
             db_question_index = int(question_index) + 1
@@ -326,9 +283,9 @@ class TechnicalSession:
                     "difficulty": question.get("difficulty", "medium")
                 }
 
-                await db.store_question_response(self.session_id, db_question_index, question_data)
+                self.db_writer.add_response(db_question_index, question_data)
         except Exception as e:
-            print(f"❌ Error storing question response in database: {e}")
+            print(f"❌ Error queueing question response for database: {e}")
     
     async def complete_interview_in_db(self, final_results: Dict):
         """Mark interview as completed in database"""
@@ -390,6 +347,8 @@ class TechnicalSession:
                     return False
                 print(f"✅ Session record created: {self.interview_id}")
 
+            # Buffered responses and progress go in before the completion record
+            await self.db_writer.close()
             success = await db.complete_interview(self.session_id, results_data)
 
             if success:
@@ -410,17 +369,19 @@ class TechnicalSession:
             return self.questions[self.current_question_index]
         return None
     
-    def next_question(self):
+    async def next_question(self):
         self.current_question_index += 1
-        self.question_start_time = time.time()
         self.hints_used = 0
         self.approach_discussed = False
         self.question_submitted = False  # Reset for new question
         
         # Update progress in database
-        asyncio.create_task(self.update_progress_in_db())
+        self.update_progress_in_db()
         
-        return self.get_current_question()
+        question = await self.wait_for_current_question()
+        # Start the clock once the question can actually be shown
+        self.question_start_time = time.time()
+        return question
     
     def add_score(self, score: int):
         self.scores.append(score)
@@ -477,16 +438,128 @@ Technical interviews include code evaluation and real-time hints.
 # -----------------------------
 # HTTP routes
 # -----------------------------
+@app.on_event("startup")
+async def start_question_pool():
+    if not llm_gateway.is_available():
+        print("⚠️ Groq client not available, question pool disabled")
+        return
+    question_pool.prewarm(QUESTION_DIFFICULTIES)
+    question_pool.start()
+
+
+@app.on_event("startup")
+async def start_audio_decoders():
+    decoder_pool.start()
+
+
+@app.on_event("startup")
+async def start_audio_workers():
+    asyncio.create_task(audio_workers.start())
+
+
+@app.on_event("startup")
+async def warm_stt_backend():
+    # Loading local models takes seconds; don't hold up startup for it
+    asyncio.create_task(audio_workers.io.run(lambda: stt_backends.get_backend().warm()))
+
+
+@app.on_event("shutdown")
+async def stop_question_pool():
+    await question_pool.stop()
+
+
+@app.on_event("shutdown")
+async def stop_audio_decoders():
+    await decoder_pool.stop()
+
+
+@app.on_event("shutdown")
+async def stop_audio_workers():
+    audio_workers.shutdown()
+
+
+@app.on_event("shutdown")
+async def flush_session_writes():
+    await asyncio.gather(*[session.db_writer.close() for session in list(technical_sessions.values())])
+
+
+@app.on_event("shutdown")
+async def stop_database_executor():
+    # Waits for writes still in flight
+    await asyncio.to_thread(db.shutdown)
+
+
 @app.get("/")
 def root():
     return {"status": "ok", "message": "Interview server running"}
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness: probes the LLM provider asynchronously; 503 until it answers"""
+    provider = await llm_gateway.probe_provider()
+    body = {"ready": provider["ok"], "provider": provider, "degraded": llm_gateway.is_degraded()}
+    return JSONResponse(body, status_code=200 if provider["ok"] else 503)
+
+
 @app.get("/topics")
 def list_topics():
     return {"topics": TOPIC_OPTIONS}
 
 
+@app.get("/question_pool")
+def question_pool_stats():
+    return question_pool.stats()
+
+
+@app.get("/audio_decoders")
+def audio_decoder_stats():
+    return decoder_pool.stats()
+
+
+@app.get("/stt")
+def stt_stats():
+    return stt_backends.get_backend().stats()
+
+
+@app.get("/audio_workers")
+def audio_worker_stats():
+    return audio_workers.stats()
+
+
+@app.get("/tts")
+def text_to_speech(text: str, lang: str = tts_service.TTS_LANG):
+    """
+    Speech for `text` as a chunked MP3 stream. Playback can start with the
+    first synthesized sentence; repeated phrases come from the cache.
+    """
+    # Checked up front: once streaming starts, errors can no longer change the status code
+    if len(text) > tts_service.TTS_MAX_CHARS:
+        raise HTTPException(status_code=413, detail=f"Text longer than {tts_service.TTS_MAX_CHARS} characters")
+    try:
+        tts_service.validate_request(text, lang)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # A sync iterator, so Starlette pulls it from its threadpool, off the event loop
+    return StreamingResponse(tts_service.stream_speech(text, lang), media_type=tts_service.MEDIA_TYPE)
+
+
+@app.get("/tts_cache")
+def tts_cache_stats():
+    return tts_service.phrase_cache.stats()
+
+
+@app.get("/evaluation_cache")
+def evaluation_cache_stats():
+    return evaluation_cache.stats()
+
+
+@app.get("/metrics/llm")
+def llm_metrics():
+    """Scheduler queue depth and wait times per model / priority class, plus circuit/timeout and routing stats"""
+    return {**scheduler.metrics(), "resilience": llm_resilience.metrics(), "routing": model_routing.metrics()}
+
+
 @app.post("/upload_resume")
 async def upload_resume(file: UploadFile = File(...)):
     if file.content_type not in ("application/pdf", "application/octet-stream"):
@@ -512,7 +585,8 @@ async def upload_resume(file: UploadFile = File(...)):
             pass
 
     resume_id = str(uuid.uuid4())
-    resume_store[resume_id] = text
+    # Whitespace-compacted once here; the text is resent in every interviewer prompt
+    resume_store[resume_id] = compact_text(text)
     return {"resume_id": resume_id, "pages": page_count}
 
 
@@ -622,18 +696,155 @@ async def get_interview_details(session_id: str):
 # -----------------------------
 # WebSocket endpoint
 # -----------------------------
+async def receive_frame(ws: WebSocket) -> Tuple[Optional[str], Optional[bytes]]:
+    """Next client frame as (text, bytes); binary frames carry streamed PCM audio"""
+    message = await ws.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    return message.get("text"), message.get("bytes")
+
+
+def partial_transcriber(ws: WebSocket) -> PartialTranscriber:
+    """Windowed STT for one connection; stitched text is pushed as partial_transcript"""
+    async def send_partial(text: str):
+        await ws.send_text(json.dumps({"type": "partial_transcript", "transcript": text}))
+
+    return PartialTranscriber(lambda pcm: audio_workers.transcribe_pcm(pcm, SAMPLE_RATE), send_partial, SAMPLE_RATE)
+
+
+async def start_audio_stream(ws: WebSocket, audio: AudioStream, partials: PartialTranscriber, msg: dict,
+                             listening_message: str):
+    """
+    audio_start: {"encoding": "pcm" | "webm" | "ogg", "sample_rate": 16000,
+                  "endpointing": "server" | "client", "partials": bool}
+    PCM must be 16 kHz mono 16-bit; WebM/Ogg Opus is decoded server-side.
+    """
+    encoding = msg.get("encoding", "pcm")
+    decoder = None
+    if encoding == "pcm":
+        if msg.get("sample_rate", SAMPLE_RATE) != SAMPLE_RATE:
+            await ws.send_text(json.dumps({
+                "type": "error", "error": f"Audio must be {SAMPLE_RATE} Hz mono 16-bit PCM"
+            }))
+            return
+    elif encoding in INPUT_FORMATS:
+        audio.cancel()
+        try:
+            decoder = await decoder_pool.acquire(encoding)
+        except Exception as e:
+            await ws.send_text(json.dumps({
+                "type": "error", "error": f"Audio decoder unavailable: {str(e)}"
+            }))
+            return
+    else:
+        await ws.send_text(json.dumps({
+            "type": "error", "error": f"Unsupported audio encoding: {encoding}"
+        }))
+        return
+    audio.start(server_endpointing=msg.get("endpointing", "server") != "client", decoder=decoder)
+    partials.reset()
+    partials.enabled = bool(msg.get("partials", STT_PARTIAL_TRANSCRIPTS))
+    await ws.send_text(json.dumps({"type": "listening", "message": listening_message}))
+
+
+async def feed_audio(ws: WebSocket, audio: AudioStream, partials: PartialTranscriber, chunk: bytes) -> bool:
+    """Buffer (and decode) a binary frame; True once the utterance is complete and should be answered"""
+    try:
+        event = await audio.receive(chunk)
+    except Exception as e:
+        audio.cancel()
+        partials.reset()
+        await ws.send_text(json.dumps({
+            "type": "error", "error": f"Audio decoding failed: {str(e)}"
+        }))
+        return False
+    if event:
+        return True
+    if partials.enabled and audio.speech_started:
+        partials.update(audio.pcm, audio.buffered_samples)
+    return False
+
+
+async def transcribe_utterance(pcm: bytes, partials: Optional[PartialTranscriber]) -> str:
+    if partials is not None:
+        return await partials.finalize(pcm)
+    return await audio_workers.transcribe_pcm(pcm, SAMPLE_RATE)
+
+
+async def send_spoken_answer(ws: WebSocket, session: dict, candidate: str):
+    if not transcript_is_valid(candidate):
+        await ws.send_text(json.dumps({
+            "type": "invalid_transcript",
+            "message": "Could not understand. Please repeat more clearly.",
+            "transcript": candidate
+        }))
+        return
+    await ws.send_text(json.dumps({
+        "type": "transcribed",
+        "transcript": candidate
+    }))
+    await send_interviewer_reply(ws, session, candidate)
+
+
+async def answer_from_audio(ws: WebSocket, session: dict, pcm: bytes, heard_speech: bool,
+                            partials: Optional[PartialTranscriber] = None):
+    """Transcribe an utterance off the event loop (only its tail if partials ran) and reply to it"""
+    if not heard_speech:
+        if partials is not None:
+            partials.reset()
+        await ws.send_text(json.dumps({
+            "type": "no_speech",
+            "message": "No speech detected. Please speak louder or check your microphone."
+        }))
+        return
+    try:
+        candidate = await transcribe_utterance(pcm, partials)
+    except Exception as e:
+        await ws.send_text(json.dumps({
+            "type": "error",
+            "error": f"Transcription failed: {str(e)}"
+        }))
+        return
+    await send_spoken_answer(ws, session, candidate)
+
+
+async def send_interviewer_reply(ws: WebSocket, session: dict, candidate: str) -> dict:
+    """Get the interviewer reply, streaming partial fields first if the client asked for it"""
+    async def on_delta(field: str, delta: str):
+        await ws.send_text(json.dumps({
+            "type": "assessment_delta", "field": field, "delta": delta
+        }))
+
+    reply = await interviewer_reply_async(candidate, session["conversation"], session["prompt"],
+                                          on_delta=on_delta if session.get("stream") else None)
+    session["conversation"].append({
+        "candidate": candidate,
+        **reply
+    })
+    # Final consolidated message, identical with or without streaming
+    await ws.send_text(json.dumps({"type": "assessment", **reply}))
+    return reply
+
+
 @app.websocket("/ws")
 async def ws_endpoint(ws: WebSocket):
     await ws.accept()
 
     session = {
         "prompt": None,
-        "conversation": []
+        # Rolling summary + recent turns under a token budget; full history in .turns
+        "conversation": ConversationContext()
     }
+    audio = AudioStream()
+    partials = partial_transcriber(ws)
 
     try:
         while True:
-            data = await ws.receive_text()
+            data, chunk = await receive_frame(ws)
+            if chunk is not None:
+                if await feed_audio(ws, audio, partials, chunk):
+                    await answer_from_audio(ws, session, *audio.finish(), partials)
+                continue
             try:
                 msg = json.loads(data)
             except Exception:
@@ -646,6 +857,8 @@ async def ws_endpoint(ws: WebSocket):
 
             if mtype == "init":
                 mode = msg.get("mode")  # "topics" | "resume"
+                # Opt-in token streaming: partial "assessment_delta" messages precede each "assessment"
+                session["stream"] = bool(msg.get("stream", False))
                 if mode == "topics":
                     topics = msg.get("topics") or []
                     if not isinstance(topics, list) or not topics:
@@ -664,8 +877,6 @@ async def ws_endpoint(ws: WebSocket):
                         "(for example, 'kosarachi' instead of 'kosaraju'), try to infer the intended word and "
                         "suggest the closest possible correct term in your feedback."
                     )
-                    import interview
-                    interview.INTERVIEWER_PROMPT = prompt
                     session["prompt"] = prompt
                     await ws.send_text(json.dumps({
                         "type": "ready",
@@ -738,8 +949,6 @@ Always reply in JSON:
 
 Resume:
 """ + resume_text
-                    import interview
-                    interview.INTERVIEWER_PROMPT = prompt
                     session["prompt"] = prompt
                     await ws.send_text(json.dumps({
                         "type": "ready",
@@ -771,12 +980,7 @@ Resume:
                     }))
                     continue
 
-                reply = interviewer_reply(candidate, session["conversation"])
-                session["conversation"].append({
-                    "candidate": candidate,
-                    **reply
-                })
-                await ws.send_text(json.dumps({"type": "assessment", **reply}))
+                await send_interviewer_reply(ws, session, candidate)
 
             elif mtype == "code_submission":
                 if not session.get("prompt"):
@@ -793,46 +997,26 @@ Resume:
 
                 # Process code submission like a regular answer
                 candidate_message = f"[Code Submission]\n{code}"
-                reply = interviewer_reply(candidate_message, session["conversation"])
-                session["conversation"].append({
-                    "candidate": candidate_message,
-                    **reply
-                })
-                await ws.send_text(json.dumps({"type": "assessment", **reply}))
+                await send_interviewer_reply(ws, session, candidate_message)
+
+            elif mtype == "audio_start":
+                await start_audio_stream(ws, audio, partials, msg, "Listening for speech...")
+
+            elif mtype == "audio_end":
+                if audio.active:
+                    await audio.flush()
+                    await answer_from_audio(ws, session, *audio.finish(), partials)
+
+            elif mtype == "audio_cancel":
+                audio.cancel()
+                partials.reset()
 
             elif mtype == "record_audio":
+                # Legacy: records from the server host's microphone (local setups only)
                 await ws.send_text(json.dumps({"type": "listening", "message": "Listening for speech..."}))
                 try:
-                    filename = f"ws_ans_{len(session['conversation'])}.wav"
-                    recorded_file, heard_speech = record_with_vad(filename)
-                    if not heard_speech:
-                        await ws.send_text(json.dumps({
-                            "type": "no_speech",
-                            "message": "No speech detected. Please speak louder or check your microphone."
-                        }))
-                        continue
-                    candidate = transcribe(recorded_file)
-                    try:
-                        os.remove(recorded_file)
-                    except Exception:
-                        pass
-                    if not transcript_is_valid(candidate):
-                        await ws.send_text(json.dumps({
-                            "type": "invalid_transcript",
-                            "message": "Could not understand. Please repeat more clearly.",
-                            "transcript": candidate
-                        }))
-                        continue
-                    await ws.send_text(json.dumps({
-                        "type": "transcribed",
-                        "transcript": candidate
-                    }))
-                    reply = interviewer_reply(candidate, session["conversation"])
-                    session["conversation"].append({
-                        "candidate": candidate,
-                        **reply
-                    })
-                    await ws.send_text(json.dumps({"type": "assessment", **reply}))
+                    pcm, heard_speech = await audio_workers.io.run(record_utterance)
+                    await answer_from_audio(ws, session, pcm, heard_speech)
                 except Exception as e:
                     await ws.send_text(json.dumps({
                         "type": "error",
@@ -847,7 +1031,7 @@ Resume:
                             "interview_id": str(uuid.uuid4()),
                             "timestamp": json.dumps(None, default=str),  # Will be handled by JSON encoder
                             "interview_type": session.get("mode", "unknown"),
-                            "conversation": session["conversation"],
+                            "conversation": session["conversation"].turns,
                             "resume_id": session.get("resume_id"),
                             "topics": session.get("topics", []),
                             "total_interactions": len(session["conversation"])
@@ -887,6 +1071,8 @@ Resume:
                 }))
 
     except WebSocketDisconnect:
+        audio.cancel()
+        partials.cancel()
         return
 
 
@@ -899,10 +1085,16 @@ async def technical_ws_endpoint(ws: WebSocket):
     
     session_id = None
     session = None
+    audio = AudioStream()
+    partials = partial_transcriber(ws)
     
     try:
         while True:
-            data = await ws.receive_text()
+            data, chunk = await receive_frame(ws)
+            if chunk is not None:
+                if await feed_audio(ws, audio, partials, chunk):
+                    await approach_from_audio(ws, session, *audio.finish(), partials)
+                continue
             try:
                 msg = json.loads(data)
             except Exception:
@@ -922,12 +1114,13 @@ async def technical_ws_endpoint(ws: WebSocket):
                     continue
                 
                 # Create technical interview session
-                session = TechnicalSession(topics)
+                session = await TechnicalSession.create(topics)
                 session_id = session.session_id
                 technical_sessions[session_id] = session
                 
-                # Send first question
-                current_question = session.get_current_question()
+                # Send first question as soon as it is ready; the rest keep generating
+                current_question = await session.wait_for_current_question()
+                session.question_start_time = time.time()
                 if current_question:
                     await ws.send_text(json.dumps({
                         "type": "question",
@@ -984,8 +1177,8 @@ async def technical_ws_endpoint(ws: WebSocket):
                 if session.final_evaluation:
                     feedback_msg += f"\n{session.final_evaluation.get('feedback', '')}"
                 
-                # Store question response in database
-                await session.store_question_response_in_db(
+                # Queue the question response; it is written after the feedback is sent
+                session.store_question_response_in_db(
                     session.current_question_index, 
                     msg.get("code", ""), 
                     score, 
@@ -1018,7 +1211,7 @@ async def technical_ws_endpoint(ws: WebSocket):
                         "total_time": time.time() - session.start_time,
                         "voice_responses": session.voice_responses,
                         "code_submissions": session.code_submissions,
-                        "questions_data": session.questions,
+                        "questions_data": session.generated_questions(),
                         "final_evaluation": session.final_evaluation,
                         "interview_ended_manually": False
                     }
@@ -1047,15 +1240,12 @@ async def technical_ws_endpoint(ws: WebSocket):
                 else:
                     # Move to next question
                     print(f"Moving to next question. Current index: {session.current_question_index}, Total questions: {len(session.questions)}")
-                    next_question_data = session.next_question()
+                    next_question_data = await session.next_question()
                     print(f"Next question data available: {next_question_data is not None}")
                     
                     if next_question_data:
                         print(f"Sending next question: {next_question_data.get('question', 'Unknown')[:50]}...")
                         
-                        # Update database progress
-                        await session.update_progress_in_db()
-                        
                         await ws.send_text(json.dumps({
                             "type": "question_complete",
                             "score": score,
@@ -1115,6 +1305,23 @@ async def technical_ws_endpoint(ws: WebSocket):
                         "approach_discussed": True
                     }))
 
+            elif mtype == "audio_start":
+                if not session:
+                    await ws.send_text(json.dumps({
+                        "type": "error", "error": "No active session"
+                    }))
+                    continue
+                await start_audio_stream(ws, audio, partials, msg, "Listening for your approach...")
+
+            elif mtype == "audio_end":
+                if audio.active:
+                    await audio.flush()
+                    await approach_from_audio(ws, session, *audio.finish(), partials)
+
+            elif mtype == "audio_cancel":
+                audio.cancel()
+                partials.reset()
+
             elif mtype == "record_audio":
                 if not session:
                     await ws.send_text(json.dumps({
@@ -1122,44 +1329,11 @@ async def technical_ws_endpoint(ws: WebSocket):
                     }))
                     continue
                 
+                # Legacy: records from the server host's microphone (local setups only)
                 await ws.send_text(json.dumps({"type": "listening", "message": "Listening for your approach..."}))
                 try:
-                    filename = f"technical_approach_{session.session_id}_{len(session.voice_responses)}.wav"
-                    recorded_file, heard_speech = record_with_vad(filename)
-                    
-                    if not heard_speech:
-                        await ws.send_text(json.dumps({
-                            "type": "no_speech",
-                            "message": "No speech detected. Please speak louder or describe your approach."
-                        }))
-                        continue
-                    
-                    transcript = transcribe(recorded_file)
-                    try:
-                        os.remove(recorded_file)
-                    except Exception:
-                        pass
-                    
-                    if not transcript_is_valid(transcript):
-                        await ws.send_text(json.dumps({
-                            "type": "invalid_transcript",
-                            "message": "Could not understand. Please repeat your approach more clearly.",
-                            "transcript": transcript
-                        }))
-                        continue
-                    
-                    # Store and analyze approach
-                    session.add_voice_response(transcript, "approach")
-                    session.approach_discussed = True
-                    
-                    approach_feedback = await analyze_approach_discussion(session, transcript)
-                    
-                    await ws.send_text(json.dumps({
-                        "type": "approach_analyzed",
-                        "transcript": transcript,
-                        "feedback": approach_feedback,
-                        "approach_discussed": True
-                    }))
+                    pcm, heard_speech = await audio_workers.io.run(record_utterance)
+                    await approach_from_audio(ws, session, pcm, heard_speech)
                     
                 except Exception as e:
                     await ws.send_text(json.dumps({
@@ -1174,7 +1348,7 @@ async def technical_ws_endpoint(ws: WebSocket):
                     }))
                     continue
                 
-                current_question_data = session.get_current_question()
+                current_question_data = await session.wait_for_current_question()
                 code = msg.get("code", "")
                 language = msg.get("language", "python")
                 
@@ -1190,6 +1364,9 @@ async def technical_ws_endpoint(ws: WebSocket):
 
             elif mtype == "stop_recording":
                 # Handle stopping voice recording
+                if audio.active:
+                    await audio.flush()
+                    await approach_from_audio(ws, session, *audio.finish(), partials)
                 await ws.send_text(json.dumps({
                     "type": "recording_stopped",
                     "message": "Voice recording stopped"
@@ -1232,7 +1409,7 @@ async def technical_ws_endpoint(ws: WebSocket):
                     "total_time": total_duration,
                     "voice_responses": session.voice_responses,
                     "code_submissions": session.code_submissions,
-                    "questions_data": session.questions,
+                    "questions_data": session.generated_questions(),
                     "final_evaluation": session.final_evaluation,
                     "interview_ended_manually": True,
                     "completion_status": "manually_ended",
@@ -1270,9 +1447,17 @@ async def technical_ws_endpoint(ws: WebSocket):
                 }))
 
     except WebSocketDisconnect:
+        audio.cancel()
+        partials.cancel()
+        if session:
+            session.cancel_pending_generation()
         if session_id and session_id in technical_sessions:
             del technical_sessions[session_id]
         return
+    finally:
+        # Whatever ended the handler, buffered responses / progress still get written
+        if session:
+            await session.db_writer.close()
 
 
 # -----------------------------
@@ -1285,11 +1470,19 @@ async def llm_evaluate_code_submission(session: TechnicalSession, code: str, lan
     print(f"🔍 Starting evaluation for question {session.current_question_index + 1}")
     print(f"🔍 Code length: {len(code)}, Language: {language}, Time: {time_spent/1000:.1f}s, Hints: {hints_used}")
     
-    if not client:
-        print("❌ Groq client not available, using fallback evaluation")
+    current_question = await session.wait_for_current_question()
+    cache_key = evaluation_key(current_question['question'], code, language, time_spent, hints_used,
+                               session.approach_discussed)
+    cached = await evaluation_cache.get(cache_key)
+    if cached is not None:
+        print(f"♻️ Reusing cached evaluation: score={cached['score']}")
+        session.final_evaluation = cached
+        return int(cached["score"])
+
+    if not llm_gateway.is_available() or llm_gateway.is_degraded():
+        print("❌ Groq client not available or degraded, using fallback evaluation")
         return evaluate_code_submission_fallback(session, code, language, time_spent, hints_used)
     
-    current_question = session.get_current_question()
     print(f"🎯 Evaluating against question: {current_question['question'][:50]}...")
     
     # Prepare evaluation context
@@ -1325,68 +1518,29 @@ Respond exactly like this:
     print(f"📤 Sending evaluation prompt to LLM...")
 
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        # JSON mode + schema validation (score must be a number in 0-100)
+        evaluation = await llm_gateway.chat_json(
             messages=[
                 {"role": "system", "content": "You are a technical interviewer. Always respond with valid JSON only. Never use markdown formatting."},
                 {"role": "user", "content": evaluation_prompt}
             ],
+            schema=EVALUATION_SCHEMA,
             temperature=0.2,
-            max_tokens=400
+            max_tokens=400,
+            priority=Priority.EVALUATION,
+            call_site="code_evaluation"
         )
         
-        response_content = response.choices[0].message.content
-        print(f"📥 Evaluation Response Length: {len(response_content) if response_content else 0}")
-        print(f"📥 Evaluation Response Preview: {response_content[:100] if response_content else 'EMPTY'}...")
-        
-        if not response_content or response_content.strip() == "":
-            print("❌ Empty response from LLM")
-            return evaluate_code_submission_fallback(session, code, language, time_spent, hints_used)
-        
-        print(f"🔍 Raw LLM evaluation response: {response_content}")  # Full debug logging
+        print(f"📥 Evaluation parsed: score={evaluation['score']}")
         
-        import json
-        
-        # Multi-layer JSON parsing strategy
-        evaluation = None
-        
-        # Layer 1: Direct parsing
-        try:
-            evaluation = json.loads(response_content.strip())
-        except json.JSONDecodeError:
-            # Layer 2: Extract and repair JSON
-            try:
-                extracted = extract_json_from_response(response_content)
-                repaired = repair_json_string(extracted)
-                evaluation = json.loads(repaired)
-            except json.JSONDecodeError:
-                # Layer 3: Manual cleanup and retry
-                try:
-                    cleaned = response_content.strip()
-                    # Remove any text before first {
-                    if '{' in cleaned:
-                        cleaned = cleaned[cleaned.find('{'):]
-                    # Remove any text after last }
-                    if '}' in cleaned:
-                        cleaned = cleaned[:cleaned.rfind('}')+1]
-                    # Remove markdown and repair
-                    cleaned = repair_json_string(cleaned)
-                    evaluation = json.loads(cleaned)
-                except json.JSONDecodeError as final_error:
-                    print(f"JSON decode error: {final_error}")
-                    print(f"Raw response: {response_content}")
-                    return evaluate_code_submission_fallback(session, code, language, time_spent, hints_used)
-        
-        if evaluation:
-            score = evaluation.get("score", 70)
-            if not isinstance(score, (int, float)) or score < 0 or score > 100:
-                print(f"Invalid score from LLM: {score}")
-                return evaluate_code_submission_fallback(session, code, language, time_spent, hints_used)
-            
-            # Store detailed evaluation in session for results
-            session.final_evaluation = evaluation
-            return int(score)
-            
+        # Store detailed evaluation in session for results
+        session.final_evaluation = evaluation
+        await evaluation_cache.put(cache_key, evaluation)
+        return int(evaluation["score"])
+    
+    except StructuredOutputError as e:
+        print(f"Invalid evaluation payload from LLM: {e}")
+        return evaluate_code_submission_fallback(session, code, language, time_spent, hints_used)
     except Exception as e:
         print(f"Error in LLM evaluation: {e}")
         # Fallback to basic evaluation
@@ -1426,15 +1580,60 @@ def evaluate_code_submission_fallback(session: TechnicalSession, code: str, lang
     return final_score
 
 
+async def send_spoken_approach(ws: WebSocket, session: TechnicalSession, transcript: str):
+    if not transcript_is_valid(transcript):
+        await ws.send_text(json.dumps({
+            "type": "invalid_transcript",
+            "message": "Could not understand. Please repeat your approach more clearly.",
+            "transcript": transcript
+        }))
+        return
+    
+    # Store and analyze approach
+    session.add_voice_response(transcript, "approach")
+    session.approach_discussed = True
+    
+    approach_feedback = await analyze_approach_discussion(session, transcript)
+    
+    await ws.send_text(json.dumps({
+        "type": "approach_analyzed",
+        "transcript": transcript,
+        "feedback": approach_feedback,
+        "approach_discussed": True
+    }))
+
+
+async def approach_from_audio(ws: WebSocket, session: TechnicalSession, pcm: bytes, heard_speech: bool,
+                              partials: Optional[PartialTranscriber] = None):
+    """Transcribe an approach explanation off the event loop (only its tail if partials ran) and analyze it"""
+    if not heard_speech:
+        if partials is not None:
+            partials.reset()
+        await ws.send_text(json.dumps({
+            "type": "no_speech",
+            "message": "No speech detected. Please speak louder or describe your approach."
+        }))
+        return
+    try:
+        transcript = await transcribe_utterance(pcm, partials)
+    except Exception as e:
+        await ws.send_text(json.dumps({
+            "type": "error",
+            "error": f"Transcription failed: {str(e)}"
+        }))
+        return
+    await send_spoken_approach(ws, session, transcript)
+
+
 async def analyze_approach_discussion(session: TechnicalSession, transcript: str) -> str:
     """
     Analyze the quality of approach discussion using LLM
     """
-    if not client:
-        print("Groq client not available, using fallback approach analysis")
+    if not llm_gateway.is_available() or llm_gateway.is_degraded():
+        print("Groq client not available or degraded, using fallback approach analysis")
         return "Good start on explaining your approach. Consider discussing time complexity and edge cases for a more complete analysis."
     
-    current_question = session.get_current_question()
+    current_question = await session.wait_for_current_question()
     
     analysis_prompt = f"""
 Analyze the candidate's approach discussion for this technical interview question.
@@ -1456,14 +1655,15 @@ Provide constructive reply like an interviewer (2-3 sentences) focusing on stren
 """
 
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        response_content = await llm_gateway.chat_completion(
             messages=[{"role": "user", "content": analysis_prompt}],
             temperature=0.4,
-            max_tokens=300
+            max_tokens=300,
+            priority=Priority.APPROACH_ANALYSIS,
+            call_site="approach_analysis",
+            validate=short_text_validator(800)
         )
         
-        response_content = response.choices[0].message.content
         if not response_content or response_content.strip() == "":
             print("Empty response from LLM for approach analysis")
             return "Good start on explaining your approach. Consider discussing time complexity and edge cases for a more complete analysis."
@@ -1478,8 +1678,8 @@ async def generate_smart_hint(session: TechnicalSession, question_data: dict, cu
     """
     Generate contextual hints using LLM based on current progress
     """
-    if not client:
-        print("Groq client not available, using fallback hint generation")
+    if not llm_gateway.is_available() or llm_gateway.is_degraded():
+        print("Groq client not available or degraded, using fallback hint generation")
         return generate_hint_fallback(question_data, current_code, language, session.hints_used)
     hint_prompt = f"""
 You are helping a candidate in a technical interview. They've asked for a hint.
@@ -1506,14 +1706,15 @@ Keep the hint to 1-2 sentences.
 """
 
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        response_content = await llm_gateway.chat_completion(
             messages=[{"role": "user", "content": hint_prompt}],
             temperature=0.6,
-            max_tokens=200
+            max_tokens=200,
+            priority=Priority.HINT,
+            call_site="hint",
+            validate=short_text_validator(400)
         )
         
-        response_content = response.choices[0].message.content
         if not response_content or response_content.strip() == "":
             print("Empty response from LLM for hint generation")
             return generate_hint_fallback(question_data, current_code, language, session.hints_used)